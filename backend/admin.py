@@ -1,7 +1,7 @@
 from flask import Flask
 from flask_admin import Admin
 from flask_admin.contrib.sqla import ModelView
-from models import db, Usuario, TipoUsuario, KML, KMLTaipas, Archivo, TipoArchivo
+from models import db, Usuario, TipoUsuario, KML, KMLTaipas, Archivo, TipoArchivo, ArchivoPoligono
 
 # Configuración del panel de administración
 def setup_admin(app):
@@ -14,6 +14,7 @@ def setup_admin(app):
     admin.add_view(ModelView(KMLTaipas, db.session))
     admin.add_view(ModelView(Archivo, db.session))
     admin.add_view(ModelView(TipoArchivo, db.session))
+    admin.add_view(ModelView(ArchivoPoligono, db.session))
 
     return admin
 
@@ -15,12 +15,13 @@ from models import db
 from admin import setup_admin
 from app_routes import routes
 from app_config import Config
+import instrumentacion
 
 
 
 # Configurar Flask
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-After-Id', 'X-KML-Omitidos'])
 
 
 # Configuración de la base de datos
@@ -43,6 +44,9 @@ setup_admin(app)
 # Registrar las rutas
 app.register_blueprint(routes)
 
+# Server-Timing por request y /metrics (Prometheus)
+instrumentacion.init_app(app)
+
 
 
 if __name__ == '__main__':
@@ -9,3 +9,36 @@ class Config:
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
     S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME') or os.getenv('S3_BUCKET')
     S3_REGION = os.getenv('S3_REGION') or os.getenv('AWS_REGION')
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')  # opcional, p.ej. MinIO
+
+    # Cache de URLs firmadas (por proceso)
+    S3_URL_CACHE_MAX_ENTRADAS = int(os.getenv('S3_URL_CACHE_MAX_ENTRADAS', '5000'))
+    # Una URL cacheada se reutiliza mientras le quede al menos esta fraccion de su validez
+    S3_URL_CACHE_VALIDEZ_MINIMA = float(os.getenv('S3_URL_CACHE_VALIDEZ_MINIMA', '0.5'))
+
+    # Cliente boto3: pool de conexiones, reintentos y timeouts
+    S3_MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', '50'))
+    S3_RETRY_MODE = os.getenv('S3_RETRY_MODE', 'adaptive')
+    S3_MAX_ATTEMPTS = int(os.getenv('S3_MAX_ATTEMPTS', '5'))
+    S3_CONNECT_TIMEOUT = float(os.getenv('S3_CONNECT_TIMEOUT', '5'))
+    S3_READ_TIMEOUT = float(os.getenv('S3_READ_TIMEOUT', '60'))
+    S3_TCP_KEEPALIVE = os.getenv('S3_TCP_KEEPALIVE', 'true').lower() in ('1', 'true', 'si')
+    # Un cliente por hilo en lugar de uno por proceso (los clientes boto3 ya son thread-safe)
+    S3_CLIENTE_POR_HILO = os.getenv('S3_CLIENTE_POR_HILO', 'false').lower() in ('1', 'true', 'si')
+
+    # TransferConfig compartido para uploads/downloads gestionados (multipart)
+    S3_MULTIPART_THRESHOLD_MB = int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '16'))
+    S3_MULTIPART_CHUNKSIZE_MB = int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '16'))
+    S3_MAX_CONCURRENCY = int(os.getenv('S3_MAX_CONCURRENCY', '8'))
+    # Motor multipart propio (s3_service.subir_multipart): SHA256 o CRC32C (requiere awscrt)
+    S3_CHECKSUM_ALGORITMO = os.getenv('S3_CHECKSUM_ALGORITMO', 'SHA256').upper()
+
+    # /api/subir_archivos: archivos subidos a S3 en paralelo por request
+    SUBIDA_MASIVA_HILOS = int(os.getenv('SUBIDA_MASIVA_HILOS', '4'))
+    # /api/subir_archivo/stream: hilos por upload (partes en memoria <= 2 x hilos)
+    SUBIDA_STREAM_HILOS = int(os.getenv('SUBIDA_STREAM_HILOS', '4'))
+
+    # GETs identicos concurrentes comparten una ejecucion (ver coalescencia.py).
+    # Un seguidor espera al lider a lo sumo este timeout y despues ejecuta por su cuenta.
+    COALESCENCIA_ACTIVA = os.getenv('COALESCENCIA_ACTIVA', 'true').lower() in ('1', 'true', 'si')
+    COALESCENCIA_TIMEOUT = float(os.getenv('COALESCENCIA_TIMEOUT', '10'))
@@ -526,7 +526,7 @@ def subir_kml():
 
     
 
-from sqlalchemy.orm import subqueryload
+from sqlalchemy.orm import subqueryload, lazyload
 
 @routes.route('/api/productor/kml', methods=['GET'])
 def obtener_kml_por_productor():
@@ -569,61 +569,135 @@ def obtener_kml_por_productor():
         'kmls': [kml.serialize() for kml in kmls]
     }), 200
 
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, send_file, Response, stream_with_context, make_response
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from flask_jwt_extended import create_access_token, jwt_required
-from models import db, Usuario, TipoUsuario, KML, KMLTaipas, Archivo, TipoArchivo
+from models import db, Usuario, TipoUsuario, KML, KMLTaipas, Archivo, TipoArchivo, ArchivoPoligono
 from s3_service import (
     subir_archivo_a_s3,
     eliminar_archivo_de_s3,
+    eliminar_archivos_de_s3,
     generar_url_firmada,
+    generar_urls_firmadas,
+    estadisticas_cache_urls,
     descargar_archivo_de_s3,
+    abrir_stream_de_s3,
+    iterar_stream_de_s3,
+    tamano_de_objeto_s3,
+    iniciar_upload_multipart,
+    completar_upload_multipart,
+    abortar_upload_multipart,
+    subir_multipart,
     S3ServiceError,
 )
 from app_config import Config
 import xml.etree.ElementTree as ET
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy import insert, delete, or_
+from sqlalchemy.exc import IntegrityError
 import io
+import os
+import re
+import gzip
+import zipfile
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+from functools import wraps
+from werkzeug.http import quote_etag
+
+from kml_service import kml_a_geojson, enriquecer_geojson, serializar_geojson
+import versiones_tablas
+import coalescencia
+import instrumentacion
 
 # 🔧 Import de Dropbox con alias (para no chocar con listar_archivos de S3)
 from dropbox_service import (
     listar_archivos as dbx_listar_archivos,
     subir_archivo as dbx_subir_archivo,
-    descargar_archivo as dbx_descargar_archivo,
+    descargar_archivo_stream as dbx_descargar_archivo_stream,
     mover_archivo as dbx_mover_archivo,
+    registrar_move_pendiente as dbx_registrar_move_pendiente,
+    move_pendiente as dbx_move_pendiente,
+    listar_moves_pendientes as dbx_listar_moves_pendientes,
+    reintentar_moves_pendientes as dbx_reintentar_moves_pendientes,
 )
 
 
-def kml_to_geojson(kml_data):
-    """Convert KML data to GeoJSON format."""
-    kml_tree = ET.ElementTree(ET.fromstring(kml_data))
-    root = kml_tree.getroot()
+def condicional(*tablas):
+    """
+    GET con ETag fuerte derivado de la version de `tablas` (ver versiones_tablas)
+    y de la query string: si coincide If-None-Match se responde 304 con una
+    sola consulta por clave primaria. If-None-Match se compara en forma debil
+    (RFC 9110 13.1.2), asi que tambien vale el W/"..." de un proxy que
+    debilito el ETag. Sin las filas de version (base sin migrar) la vista se
+    sirve completa, sin ETag.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            # La version se lee antes de consultar: si cambia en el medio, el
+            # ETag queda viejo y el proximo GET trae los datos nuevos.
+            versiones = versiones_tablas.versiones(*tablas)
+            if len(versiones) < len(tablas):
+                return vista(*args, **kwargs)
+            clave = ','.join(str(versiones[t]) for t in tablas)
+            etag = hashlib.sha256(f"{clave}:{request.query_string.decode()}".encode()).hexdigest()[:32]
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(vista(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return envoltura
+    return decorador
+
+
+def coalescido(timeout=None):
+    """
+    GETs identicos concurrentes (mismo endpoint, mismos parametros en cualquier
+    orden) comparten una ejecucion de la vista: la corre el primero y los demas
+    reciben una copia de su respuesta (ver coalescencia). Solo para vistas cuya
+    respuesta depende unicamente de la URL, no del usuario, y que no hacen stream.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            if not Config.COALESCENCIA_ACTIVA:
+                return vista(*args, **kwargs)
+            # sort estable: se normaliza el orden entre parametros, no el de los
+            # valores repetidos de un mismo parametro
+            clave = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True), key=lambda item: item[0])),
+            )
 
-    ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+            def ejecutar_vista():
+                # Se comparten bytes, status y headers; cada request arma su propia
+                # Response para que los after_request no pisen la de otro hilo.
+                response = make_response(vista(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers.items())
 
-    geojson_features = []
-    for placemark in root.findall('.//kml:Placemark', ns):
-        geometry = placemark.find('.//kml:Polygon//kml:coordinates', ns)
-        if geometry is not None:
-            coordinates = geometry.text.strip().split(' ')
-            coords = [[float(coord.split(',')[0]), float(coord.split(',')[1])] for coord in coordinates]
-            feature = {
-                'type': 'Feature',
-                'geometry': {
-                    'type': 'Polygon',
-                    'coordinates': [coords]
-                },
-                'properties': {
-                    'name': placemark.find('.//kml:name', ns).text if placemark.find('.//kml:name', ns) is not None else 'Unnamed'
-                }
-            }
-            geojson_features.append(feature)
+            cuerpo, status, headers = coalescencia.ejecutar(
+                clave, ejecutar_vista,
+                timeout if timeout is not None else Config.COALESCENCIA_TIMEOUT,
+                grupo=request.endpoint,
+            )
+            return Response(cuerpo, status=status, headers=headers)
+        return envoltura
+    return decorador
 
-    return {
-        'type': 'FeatureCollection',
-        'features': geojson_features
-    }
+
+def kml_to_geojson(kml_data):
+    """Convert KML/KMZ data (bytes o file-like) to GeoJSON format."""
+    return kml_a_geojson(kml_data)
 
 
 # Crear un Blueprint para las rutas
@@ -651,7 +725,7 @@ def crear_usuario():
         nom_us=data['nom_us'],
         pass_us=hashed_password,
         nombre=data['nombre'],
-        cod_productor=data.get('cod_productor'),
+        cod_productor=(data.get('cod_productor') or '').strip() or None,
         tipo_us=tipo_usuario.id_tipo,
         premium=data.get('premium', False)
     )
@@ -660,15 +734,77 @@ def crear_usuario():
         db.session.add(nuevo_usuario)
         db.session.commit()
         return jsonify(nuevo_usuario.serialize()), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"msg": "Ya existe un usuario con ese nombre o código de productor"}), 409
     except Exception:
         db.session.rollback()
         return jsonify({"msg": "Error al crear el usuario"}), 500
 
+LIMITE_MAXIMO_LISTADO = 1000
+
+CAMPOS_USUARIO = {
+    'id_usuario': Usuario.id_usuario,
+    'nom_us': Usuario.nom_us,
+    'nombre': Usuario.nombre,
+    'cod_productor': Usuario.cod_productor,
+    'tipo_us': Usuario.tipo_us,
+    'premium': Usuario.premium,
+}
+
+
+def _parametros_listado(campos_disponibles):
+    """
+    Lee ?after_id=, ?limit= y ?fields=a,b de la request.
+    Retorna ((after_id, limit, campos), None) o (None, (respuesta, status)).
+    Sin limit se devuelve todo (compatibilidad); con limit se topea a LIMITE_MAXIMO_LISTADO.
+    """
+    try:
+        after_id = int(request.args['after_id']) if request.args.get('after_id') else None
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+    except ValueError:
+        return None, ({"msg": "after_id y limit deben ser enteros"}, 400)
+    if limit is not None:
+        limit = max(1, min(limit, LIMITE_MAXIMO_LISTADO))
+
+    campos = list(campos_disponibles)
+    if request.args.get('fields'):
+        campos = [c.strip() for c in request.args['fields'].split(',') if c.strip()]
+        desconocidos = [c for c in campos if c not in campos_disponibles]
+        if desconocidos:
+            return None, ({"msg": f"Campos no validos: {', '.join(desconocidos)}"}, 400)
+    return (after_id, limit, campos), None
+
+
+def _listar_usuarios(query):
+    """Listado de usuarios con paginacion por id, proyeccion de campos y ?q= sobre nombre/cod_productor."""
+    parametros, error = _parametros_listado(CAMPOS_USUARIO)
+    if error:
+        return jsonify(error[0]), error[1]
+    after_id, limit, campos = parametros
+
+    texto = (request.args.get('q') or '').strip()
+    if texto:
+        query = query.filter(or_(
+            Usuario.nombre.icontains(texto, autoescape=True),
+            Usuario.cod_productor.icontains(texto, autoescape=True),
+        ))
+    if after_id is not None:
+        query = query.filter(Usuario.id_usuario > after_id)
+    query = query.order_by(Usuario.id_usuario)
+    if limit is not None:
+        query = query.limit(limit)
+
+    filas = query.with_entities(Usuario.id_usuario, *(CAMPOS_USUARIO[c] for c in campos)).all()
+    response = jsonify([dict(zip(campos, fila[1:])) for fila in filas])
+    if limit is not None and len(filas) == limit:
+        response.headers['X-Next-After-Id'] = str(filas[-1][0])
+    return response, 200
+
+
 @routes.route('/api/usuarios', methods=['GET'])
 def obtener_usuarios():
-    usuarios = Usuario.query.all()
-    usuarios_serializados = [usuario.serialize() for usuario in usuarios]
-    return jsonify(usuarios_serializados), 200
+    return _listar_usuarios(Usuario.query)
 
 @routes.route('/api/usuario/<int:id_usuario>', methods=['DELETE'])
 def eliminar_usuario(id_usuario):
@@ -696,6 +832,9 @@ def actualizar_usuario(id_usuario):
 
     if 'pass_us' in data and data['pass_us']:
         data['pass_us'] = generate_password_hash(data['pass_us'], method='pbkdf2:sha256')
+    if 'cod_productor' in data:
+        # cod_productor es unico: "sin codigo" se guarda como NULL
+        data['cod_productor'] = (data['cod_productor'] or '').strip() or None
 
     for key in data:
         if hasattr(usuario, key) and key != 'id_usuario':
@@ -704,6 +843,9 @@ def actualizar_usuario(id_usuario):
     try:
         db.session.commit()
         return jsonify(usuario.serialize()), 200
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"msg": "Ya existe un usuario con ese nombre o código de productor"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Error al actualizar el usuario", "error": str(e)}), 500
@@ -725,6 +867,7 @@ def crear_tipo_usuario():
         return jsonify({"msg": "Error al crear el tipo de usuario"}), 500
 
 @routes.route('/api/tipo_usuario', methods=['GET'])
+@condicional('tipo_usuarios')
 def obtener_tipos_usuario():
     tipos_usuario = TipoUsuario.query.all()
     return jsonify([tipo.serialize() for tipo in tipos_usuario]), 200
@@ -788,6 +931,7 @@ def crear_tipo_archivo():
         return jsonify({"msg": "Error al crear el tipo de archivo"}), 500
 
 @routes.route('/api/tipo_archivo', methods=['GET'])
+@condicional('tipo_archivos')
 def obtener_tipos_archivo():
     tipos_archivo = TipoArchivo.query.all()
     return jsonify([tipo.serialize() for tipo in tipos_archivo]), 200
@@ -803,10 +947,15 @@ def listar_archivos_s3():
     if not productor:
         return jsonify({'error': 'Productor no encontrado'}), 404
 
-    archivos = Archivo.query.filter_by(us_asociado=productor.id_usuario).all()
+    archivos = (
+        Archivo.query
+        .filter_by(us_asociado=productor.id_usuario)
+        .options(joinedload(Archivo.tipo_archivo))
+        .all()
+    )
     resultado = []
     for archivo in archivos:
-        tipo_archivo = TipoArchivo.query.get(archivo.TipoArchivo)
+        tipo_archivo = archivo.tipo_archivo
         archivo_data = archivo.serialize()
         archivo_data['tipo_archivo'] = tipo_archivo.tipo if tipo_archivo else None
         resultado.append(archivo_data)
@@ -834,10 +983,10 @@ def download_file():
     path = request.args.get("path")
     if not path:
         return jsonify({"error": "Falta path"}), 400
-    blob, filename = dbx_descargar_archivo(path)
-    if blob is None:
-        return jsonify({"error": filename}), 400
-    return send_file(io.BytesIO(blob), as_attachment=True, download_name=filename)
+    chunks, metadata = dbx_descargar_archivo_stream(path)
+    if chunks is None:
+        return jsonify({"error": metadata}), 400
+    return _dropbox_stream_response(chunks, metadata)
 
 @routes.route("/move", methods=["POST"])
 def move_file():
@@ -847,22 +996,95 @@ def move_file():
     res = dbx_mover_archivo(data["from"], data["to"])
     return jsonify(res), (200 if "msg" in res else 400)
 
+CONSUME_INTENTOS_MOVE = 3
+
+
 @routes.route("/consume", methods=["GET"])
 def consume_file():
+    """
+    Descarga `path` en stream y al terminar lo mueve a `dest`. El move ocurre
+    despues de enviar la respuesta, asi que su falla no llega al cliente: se
+    reintenta, y si sigue fallando queda registrado como move pendiente (ver
+    /consume/pendientes) y el archivo no se vuelve a servir. El cliente que
+    necesite confirmarlo debe verificar con /list que ya no esta en el origen.
+    """
     path = request.args.get("path")
     dest = request.args.get("dest")
     if not path or not dest:
         return jsonify({"error": "Faltan path/dest"}), 400
 
-    blob, filename = dbx_descargar_archivo(path)
-    if blob is None:
-        return jsonify({"error": filename}), 400
+    chunks, metadata = dbx_descargar_archivo_stream(path)
+    if chunks is None:
+        return jsonify({"error": metadata}), 400
+
+    pendiente = dbx_move_pendiente(path)
+    if pendiente:
+        resultado = dbx_reintentar_moves_pendientes(path)
+        if pendiente.get("rev") == metadata.rev:
+            chunks.close()
+            return jsonify({
+                "error": "El archivo ya fue consumido y su move esta pendiente",
+                "dest": pendiente["dest"],
+                "move": next(iter(resultado.values()), None),
+            }), 409
+
+    def _consumir():
+        # El archivo se mueve solo si el stream se envio completo; si el
+        # cliente corta la descarga, queda en su lugar para reintentar.
+        yield from chunks
+        for intento in range(CONSUME_INTENTOS_MOVE):
+            res = dbx_mover_archivo(path, dest)
+            if "error" not in res:
+                return
+            if intento < CONSUME_INTENTOS_MOVE - 1:
+                time.sleep(0.5 * 2 ** intento)
+        instrumentacion.registrar_error(
+            "dropbox", "consume_move", f"path={path} dest={dest} {res['error']}")
+        dbx_registrar_move_pendiente(path, dest, metadata.rev, res["error"])
+
+    return _dropbox_stream_response(_consumir(), metadata)
+
+
+@routes.route("/consume/pendientes", methods=["GET"])
+def consume_pendientes():
+    return jsonify(dbx_listar_moves_pendientes()), 200
+
+
+@routes.route("/consume/pendientes/reintentar", methods=["POST"])
+def consume_reintentar_pendientes():
+    resultados = dbx_reintentar_moves_pendientes()
+    fallidos = sum(1 for res in resultados.values() if "error" in res)
+    return jsonify(resultados), (207 if fallidos else 200)
+
+
+def _dropbox_stream_response(chunks, metadata):
+    response = Response(
+        stream_with_context(chunks),
+        mimetype='application/octet-stream',
+        direct_passthrough=True,
+    )
+    response.headers['Content-Disposition'] = _content_disposition(metadata.name)
+    if getattr(metadata, 'size', None) is not None:
+        response.headers['Content-Length'] = str(metadata.size)
+    return response
 
-    res = dbx_mover_archivo(path, dest)
-    if "error" in res:
-        return jsonify(res), 400
 
-    return send_file(io.BytesIO(blob), as_attachment=True, download_name=filename)
+def _content_disposition(filename):
+    # Igual que send_file: nombre ASCII de respaldo + filename* en UTF-8.
+    try:
+        filename.encode('ascii')
+        return f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        ascii_name = filename.encode('ascii', 'ignore').decode('ascii') or 'archivo'
+        return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+# Mismo criterio que usaba el mapa en el frontend: "Informe_C12_C13" -> ['12', '13']
+CUADRO_RE = re.compile(r'_C(\d+)(?=_|$)')
+
+
+def _cuadros_de_nombre(nombre):
+    return list(dict.fromkeys(CUADRO_RE.findall(nombre or '')))
 
 
 def _s3_key_from_url_or_key(value):
@@ -892,15 +1114,24 @@ def debug_routes():
     return jsonify(sorted(rules, key=lambda item: item['rule'])), 200
 
 
+@routes.route('/api/debug/cache_urls', methods=['GET'])
+def debug_cache_urls():
+    return jsonify(estadisticas_cache_urls()), 200
+
+
+@routes.route('/api/debug/coalescencia', methods=['GET'])
+def debug_coalescencia():
+    return jsonify(coalescencia.estadisticas()), 200
+
+
 @routes.route('/api/usuarios/productores', methods=['GET'])
+@condicional('usuarios', 'tipo_usuarios')
 def obtener_productores_activo():
-    productores = (
+    return _listar_usuarios(
         Usuario.query
         .join(TipoUsuario)
         .filter(TipoUsuario.tipo == 'Productor')
-        .all()
     )
-    return jsonify([p.serialize() for p in productores]), 200
 
 
 @routes.route('/api/subir_archivo', methods=['POST'])
@@ -938,6 +1169,18 @@ def subir_archivo_activo():
     if not kml_asociado:
         return jsonify({"msg": "No se ha encontrado un KML asociado al productor."}), 400
 
+    nuevo_archivo = _nuevo_archivo(productor, tipo_archivo_id, kml_asociado, filename, ruta_s3)
+
+    try:
+        db.session.add(nuevo_archivo)
+        db.session.commit()
+        return jsonify({"msg": "Archivo cargado y asociado al KML exitosamente"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "Error al guardar el archivo", "error": str(e)}), 500
+
+
+def _nuevo_archivo(productor, tipo_archivo_id, kml_asociado, filename, ruta_s3):
     nuevo_archivo = Archivo(
         nombre=filename,
         ruta_descarga=f'https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{ruta_s3}',
@@ -945,17 +1188,293 @@ def subir_archivo_activo():
         TipoArchivo=tipo_archivo_id,
         kml_asociado=kml_asociado.id_kml
     )
+    nuevo_archivo.poligonos = [
+        ArchivoPoligono(poligono=cuadro) for cuadro in _cuadros_de_nombre(filename)
+    ]
+    return nuevo_archivo
+
+
+def _destino_subida(data):
+    """
+    Valida productor, tipo y KML de una subida directa a S3.
+    Retorna (productor, tipo_archivo, kml, None) o (None, None, None, (respuesta, status)).
+    """
+    cod_productor = data.get('productorId')
+    tipo_archivo_id = data.get('tipoArchivo')
+    if not tipo_archivo_id:
+        return None, None, None, ({"msg": "No se ha especificado el tipo de archivo"}, 400)
+    if not cod_productor:
+        return None, None, None, ({"msg": "No se ha especificado el productor ID"}, 400)
+
+    productor = Usuario.query.filter_by(cod_productor=cod_productor).first()
+    if not productor:
+        return None, None, None, ({"msg": "Productor no encontrado"}, 404)
+    tipo_archivo = TipoArchivo.query.filter_by(id_tipo_archivo=tipo_archivo_id).first()
+    if not tipo_archivo:
+        return None, None, None, ({"msg": "Tipo de archivo no encontrado"}, 404)
+    kml_asociado = KML.query.filter_by(us_asociado=productor.id_usuario).first()
+    if not kml_asociado:
+        return None, None, None, ({"msg": "No se ha encontrado un KML asociado al productor."}, 400)
+    return productor, tipo_archivo, kml_asociado, None
+
+
+def _nombre_en_destino(ruta_s3, productor, tipo_archivo):
+    """
+    La key la genera /iniciar: tiene que caer bajo el prefijo del productor y
+    tipo y con un nombre ya saneado. Retorna el nombre de archivo o None.
+    """
+    prefijo = f"{productor.cod_productor}/{tipo_archivo.tipo}/"
+    filename = ruta_s3[len(prefijo):]
+    if not ruta_s3.startswith(prefijo) or not filename or filename != secure_filename(filename):
+        return None
+    return filename
+
+
+@routes.route('/api/subir_archivo/iniciar', methods=['POST'])
+def iniciar_subida_directa():
+    """Devuelve URLs firmadas por parte para subir el archivo directo a S3."""
+    data = request.get_json(silent=True) or {}
+    productor, tipo_archivo, _, error = _destino_subida(data)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    filename = secure_filename(data.get('nombre') or '')
+    if not filename:
+        return jsonify({"msg": "No se ha seleccionado ningun archivo"}), 400
+    try:
+        tamano = int(data.get('tamano'))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "Tamaño de archivo no valido"}), 400
+    if tamano < 0:
+        return jsonify({"msg": "Tamaño de archivo no valido"}), 400
 
+    ruta_s3 = f"{productor.cod_productor}/{tipo_archivo.tipo}/{filename}"
+    try:
+        subida = iniciar_upload_multipart(ruta_s3, tamano)
+    except S3ServiceError as e:
+        return jsonify({"msg": e.message}), e.status_code
+
+    subida['nombre'] = filename
+    return jsonify(subida), 200
+
+
+@routes.route('/api/subir_archivo/completar', methods=['POST'])
+def completar_subida_directa():
+    """Cierra el multipart upload, verifica el objeto y registra el Archivo."""
+    data = request.get_json(silent=True) or {}
+    productor, tipo_archivo, kml_asociado, error = _destino_subida(data)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    ruta_s3 = data.get('key')
+    upload_id = data.get('upload_id')
+    partes = data.get('partes')
+    if not ruta_s3 or not upload_id or not partes:
+        return jsonify({"msg": "Faltan key, upload_id o partes"}), 400
+    filename = _nombre_en_destino(ruta_s3, productor, tipo_archivo)
+    if not filename:
+        return jsonify({"msg": "La key no corresponde al productor y tipo de archivo"}), 400
+
+    try:
+        completar_upload_multipart(ruta_s3, upload_id, partes)
+    except S3ServiceError as e:
+        return jsonify({"msg": e.message}), e.status_code
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"msg": "Formato de partes no valido"}), 400
+
+    nuevo_archivo = _nuevo_archivo(productor, tipo_archivo.id_tipo_archivo, kml_asociado, filename, ruta_s3)
     try:
         db.session.add(nuevo_archivo)
         db.session.commit()
-        return jsonify({"msg": "Archivo cargado y asociado al KML exitosamente"}), 200
+        return jsonify({
+            "msg": "Archivo cargado y asociado al KML exitosamente",
+            "id_archivo": nuevo_archivo.id_archivo,
+        }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Error al guardar el archivo", "error": str(e)}), 500
 
 
+@routes.route('/api/subir_archivo/abortar', methods=['POST'])
+def abortar_subida_directa():
+    data = request.get_json(silent=True) or {}
+    productor, tipo_archivo, _, error = _destino_subida(data)
+    if error:
+        return jsonify(error[0]), error[1]
+    if not data.get('key') or not data.get('upload_id'):
+        return jsonify({"msg": "Faltan key o upload_id"}), 400
+    if not _nombre_en_destino(data['key'], productor, tipo_archivo):
+        return jsonify({"msg": "La key no corresponde al productor y tipo de archivo"}), 400
+    if not abortar_upload_multipart(data['key'], data['upload_id']):
+        return jsonify({"msg": "Error al abortar la subida en S3"}), 500
+    return jsonify({"msg": "Subida abortada"}), 200
+
+
+@routes.route('/api/subir_archivo/stream', methods=['PUT'])
+def subir_archivo_stream():
+    """
+    Sube el cuerpo crudo de la request directo a S3 a medida que llega, sin
+    pasar por el parser de formularios ni por un archivo temporal. Productor,
+    tipo y nombre van en headers (X-Productor-Id, X-Tipo-Archivo,
+    X-Nombre-Archivo, URL-encoded) o en la query string (productorId,
+    tipoArchivo, nombre).
+    """
+    destino = {
+        'productorId': request.headers.get('X-Productor-Id') or request.args.get('productorId'),
+        'tipoArchivo': request.headers.get('X-Tipo-Archivo') or request.args.get('tipoArchivo'),
+    }
+    productor, tipo_archivo, kml_asociado, error = _destino_subida(destino)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    filename = secure_filename(unquote(request.headers.get('X-Nombre-Archivo') or request.args.get('nombre') or ''))
+    if not filename:
+        return jsonify({"msg": "No se ha seleccionado ningun archivo"}), 400
+
+    if request.content_length == 0:
+        return jsonify({"msg": "El archivo esta vacio"}), 400
+
+    ruta_s3 = f"{productor.cod_productor}/{tipo_archivo.tipo}/{filename}"
+    try:
+        # subir_multipart lee partes en orden con a lo sumo 2*concurrencia en
+        # memoria y aborta el upload si el cliente corta o S3 falla.
+        resultado = subir_multipart(
+            request.stream,
+            ruta_s3,
+            concurrencia=Config.SUBIDA_STREAM_HILOS,
+            tamano=request.content_length,
+        )
+    except S3ServiceError as e:
+        return jsonify({"msg": e.message}), e.status_code
+
+    if request.content_length is not None and resultado['bytes'] != request.content_length:
+        eliminar_archivo_de_s3(ruta_s3)
+        return jsonify({"msg": "La subida llego incompleta"}), 400
+    if resultado['bytes'] == 0:
+        # Sin Content-Length el cuerpo vacio recien se ve despues de subir
+        eliminar_archivo_de_s3(ruta_s3)
+        return jsonify({"msg": "El archivo esta vacio"}), 400
+
+    nuevo_archivo = _nuevo_archivo(productor, tipo_archivo.id_tipo_archivo, kml_asociado, filename, ruta_s3)
+    try:
+        db.session.add(nuevo_archivo)
+        db.session.commit()
+        return jsonify({
+            "msg": "Archivo cargado y asociado al KML exitosamente",
+            "id_archivo": nuevo_archivo.id_archivo,
+            "bytes": resultado['bytes'],
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": "Error al guardar el archivo", "error": str(e)}), 500
+
+
+@routes.route('/api/subir_archivos', methods=['POST'])
+def subir_archivos_masivo():
+    """
+    Sube N archivos de un mismo productor y tipo: valida destino una sola vez,
+    sube a S3 en paralelo y registra todos los Archivo en una transaccion.
+    Responde el resultado por archivo (200 todos ok, 207 parcial, 400 ninguno).
+    """
+    archivos = [a for a in request.files.getlist('archivos') if a.filename]
+    if not archivos:
+        return jsonify({"msg": "No se ha subido ningun archivo"}), 400
+
+    productor, tipo_archivo, kml_asociado, error = _destino_subida(request.form)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    resultados = []
+    pendientes = []
+    rutas = set()
+    for archivo in archivos:
+        filename = secure_filename(archivo.filename)
+        ruta_s3 = f"{productor.cod_productor}/{tipo_archivo.tipo}/{filename}"
+        if not filename or ruta_s3 in rutas:
+            resultados.append({"nombre": archivo.filename, "ok": False, "msg": "Nombre de archivo no valido o repetido"})
+            continue
+        rutas.add(ruta_s3)
+        resultado = {"nombre": filename, "ok": False}
+        resultados.append(resultado)
+        pendientes.append((resultado, archivo, ruta_s3))
+
+    hilos = max(1, min(Config.SUBIDA_MASIVA_HILOS, len(pendientes)))
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        mensajes = list(pool.map(lambda p: subir_archivo_a_s3(p[1], p[2]), pendientes))
+
+    subidos = []
+    for (resultado, _, ruta_s3), mensaje in zip(pendientes, mensajes):
+        if "exitosamente" in mensaje:
+            subidos.append((resultado, ruta_s3))
+        else:
+            resultado["msg"] = mensaje
+
+    if subidos:
+        filas = [
+            {
+                'nombre': resultado['nombre'],
+                'ruta_descarga': f'https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{ruta_s3}',
+                'us_asociado': productor.id_usuario,
+                'TipoArchivo': tipo_archivo.id_tipo_archivo,
+                'kml_asociado': kml_asociado.id_kml,
+            }
+            for resultado, ruta_s3 in subidos
+        ]
+        try:
+            ids = db.session.scalars(
+                insert(Archivo).returning(Archivo.id_archivo, sort_by_parameter_order=True),
+                filas,
+            ).all()
+            poligonos = [
+                {'id_archivo': id_archivo, 'poligono': cuadro}
+                for id_archivo, (resultado, _) in zip(ids, subidos)
+                for cuadro in _cuadros_de_nombre(resultado['nombre'])
+            ]
+            if poligonos:
+                db.session.execute(insert(ArchivoPoligono), poligonos)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"msg": "Error al guardar los archivos", "error": str(e)}), 500
+
+        for id_archivo, (resultado, _) in zip(ids, subidos):
+            resultado.update(ok=True, id_archivo=id_archivo)
+
+    print(
+        "[SUBIDA_MASIVA] "
+        f"productor={productor.cod_productor} tipo={tipo_archivo.tipo} "
+        f"archivos={len(archivos)} subidos={len(subidos)} hilos={hilos}"
+    )
+    if len(subidos) == len(resultados):
+        status = 200
+    elif subidos:
+        status = 207
+    else:
+        status = 400
+    return jsonify({"subidos": len(subidos), "total": len(resultados), "archivos": resultados}), status
+
+
+CAMPOS_ARCHIVO = [
+    'id_archivo', 'nombre', 'disponible', 'ruta_descarga', 'fecha_subida', 'us_asociado',
+    'kml_asociado', 'kml_taipas_asociado', 'tipo_archivo', 'ruta_descarga_app',
+]
+
+
+def _archivos_de_productor(productor, categoria=None):
+    query = (
+        Archivo.query
+        .filter_by(us_asociado=productor.id_usuario)
+        .options(joinedload(Archivo.tipo_archivo))
+    )
+    if categoria:
+        tipo_archivo = TipoArchivo.query.filter_by(tipo=categoria).first()
+        if tipo_archivo:
+            query = query.filter_by(TipoArchivo=tipo_archivo.id_tipo_archivo)
+    return query
+
+
 @routes.route('/api/productor/archivos', methods=['GET'])
+@coalescido()
 def obtener_archivos_por_productor_activo():
     cod_productor = request.args.get('cod_productor')
     categoria = request.args.get('categoria')
@@ -967,29 +1486,61 @@ def obtener_archivos_por_productor_activo():
     if not productor:
         return jsonify({'error': 'Productor no encontrado'}), 404
 
-    query = Archivo.query.filter_by(us_asociado=productor.id_usuario)
-    if categoria:
-        tipo_archivo = TipoArchivo.query.filter_by(tipo=categoria).first()
-        if tipo_archivo:
-            query = query.filter_by(TipoArchivo=tipo_archivo.id_tipo_archivo)
+    parametros, error = _parametros_listado(CAMPOS_ARCHIVO)
+    if error:
+        return jsonify(error[0]), error[1]
+    after_id, limit, campos = parametros
+
+    columnas = {'id_archivo', 'TipoArchivo', 'ruta_descarga'} | {c for c in campos if c in Archivo.__table__.c}
+    query = (
+        _archivos_de_productor(productor, categoria)
+        .options(load_only(*(getattr(Archivo, c) for c in columnas)))
+        .order_by(Archivo.id_archivo)
+    )
+    texto = (request.args.get('q') or '').strip()
+    if texto:
+        query = query.filter(Archivo.nombre.icontains(texto, autoescape=True))
+    if after_id is not None:
+        query = query.filter(Archivo.id_archivo > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    archivos = query.all()
+
+    # Firma en lote: sin head_object por archivo. Con ?verificar=1 se valida la
+    # existencia con un unico listado paginado del prefijo del productor.
+    urls_firmadas = {}
+    if 'ruta_descarga' in campos:
+        verificar = request.args.get('verificar', '').lower() in ('1', 'true', 'si')
+        urls_firmadas = generar_urls_firmadas(
+            [_s3_key_from_url_or_key(archivo.ruta_descarga) for archivo in archivos],
+            expiracion=600,
+            verificar_existencia=verificar,
+            prefijo=f"{productor.cod_productor}/",
+        )
 
     archivos_clasificados = {}
-    for archivo in query.all():
-        tipo_archivo = TipoArchivo.query.get(archivo.TipoArchivo)
+    for archivo in archivos:
+        tipo_archivo = archivo.tipo_archivo
         tipo_nombre = tipo_archivo.tipo if tipo_archivo else 'Desconocido'
         key_s3 = _s3_key_from_url_or_key(archivo.ruta_descarga)
-        url_firmada = generar_url_firmada(key_s3, expiracion=600)
-        archivo_data = archivo.serialize()
-        archivo_data['tipo_archivo'] = tipo_nombre
-        archivo_data['ruta_descarga'] = url_firmada if url_firmada else archivo.ruta_descarga
-        archivo_data['ruta_descarga_app'] = f"/api/archivo/{archivo.id_archivo}/descargar"
-        archivos_clasificados.setdefault(tipo_nombre, []).append(archivo_data)
-
-    return jsonify({
+        url_firmada = urls_firmadas.get(key_s3)
+        archivo_data = {
+            'id_archivo': archivo.id_archivo,
+            'tipo_archivo': tipo_nombre,
+            'ruta_descarga': url_firmada if url_firmada else archivo.ruta_descarga,
+            'ruta_descarga_app': f"/api/archivo/{archivo.id_archivo}/descargar",
+        }
+        archivo_data.update({c: getattr(archivo, c) for c in campos if c in Archivo.__table__.c and c not in archivo_data})
+        archivos_clasificados.setdefault(tipo_nombre, []).append({c: archivo_data[c] for c in campos})
+
+    respuesta = {
         'productor': productor.nombre,
         'cod_productor': productor.cod_productor,
         'archivos': archivos_clasificados
-    }), 200
+    }
+    if limit is not None and len(archivos) == limit:
+        respuesta['next_after_id'] = archivos[-1].id_archivo
+    return jsonify(respuesta), 200
 
 
 @routes.route('/api/archivo/<int:id_archivo>/descargar', methods=['GET'])
@@ -999,17 +1550,189 @@ def descargar_archivo_activo(id_archivo):
         return jsonify({"error": "Archivo no encontrado"}), 404
 
     key_s3 = _s3_key_from_url_or_key(archivo.ruta_descarga)
+
+    # Solo se acepta un rango simple; el resto se ignora y se envia completo.
+    rango = None
+    condiciones = {}
+    if request.range and request.range.units == 'bytes' and len(request.range.ranges) == 1:
+        rango = request.range.to_header()
+        # If-Range: el rango vale solo si el objeto sigue siendo la version que
+        # el cliente ya tiene; si no, va entero (200) para no mezclar versiones.
+        if request.headers.get('If-Range', '').lstrip().startswith('W/'):
+            rango = None  # un ETag debil no sirve para If-Range (RFC 9110 13.1.5)
+        elif request.if_range.etag:
+            condiciones['si_coincide'] = quote_etag(request.if_range.etag)
+        elif request.if_range.date:
+            # S3 no compara fechas por igualdad: "no modificado desde" es lo mas cercano
+            condiciones['si_no_modificado_desde'] = request.if_range.date
+
     try:
-        buffer, metadata = descargar_archivo_de_s3(key_s3)
+        try:
+            body, metadata = abrir_stream_de_s3(key_s3, rango=rango, **condiciones)
+        except S3ServiceError as e:
+            if not condiciones or e.status_code != 412:
+                raise
+            body, metadata = abrir_stream_de_s3(key_s3)
     except S3ServiceError as e:
-        return jsonify({"error": e.message}), e.status_code
-
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=metadata.get('filename') or archivo.nombre,
+        response = jsonify({"error": e.message})
+        response.status_code = e.status_code
+        if e.status_code == 416:
+            tamano = tamano_de_objeto_s3(key_s3)
+            if tamano is not None:
+                response.headers['Content-Range'] = f"bytes */{tamano}"
+        return response
+
+    response = Response(
+        stream_with_context(iterar_stream_de_s3(body)),
+        status=206 if metadata.get('content_range') else 200,
         mimetype=metadata.get('content_type') or 'application/octet-stream',
+        direct_passthrough=True,
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Disposition'] = _content_disposition(
+        metadata.get('filename') or archivo.nombre
+    )
+    if metadata.get('content_length') is not None:
+        response.headers['Content-Length'] = str(metadata['content_length'])
+    if metadata.get('content_range'):
+        response.headers['Content-Range'] = metadata['content_range']
+    if metadata.get('etag'):
+        response.headers['ETag'] = metadata['etag']
+    if metadata.get('last_modified'):
+        response.last_modified = metadata['last_modified']
+    return response
+
+
+# Formatos ya comprimidos: se guardan sin recomprimir (ZIP_STORED)
+EXTENSIONES_COMPRIMIDAS = {
+    '.zip', '.kmz', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.tif', '.tiff',
+    '.mp3', '.mp4', '.mov', '.avi', '.mkv',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods',
+}
+ZIP_CHUNK_SIZE = 256 * 1024
+
+
+class _SalidaZip:
+    """Destino no seekable para ZipFile: acumula lo escrito hasta que se vacia."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _abrir_entrada_zip(key_s3):
+    """Abre el objeto y lee su primer chunk (corre en el hilo de prefetch)."""
+    try:
+        body, metadata = abrir_stream_de_s3(key_s3)
+    except S3ServiceError as e:
+        return None, None, None, e.message
+    try:
+        return body, metadata, body.read(ZIP_CHUNK_SIZE), None
+    except Exception as e:
+        body.close()
+        return None, None, None, f"Error leyendo {key_s3}: {type(e).__name__}"
+
+
+def _nombres_zip(archivos, por_categoria):
+    usados = set()
+    for archivo in archivos:
+        base = archivo.nombre or os.path.basename(_s3_key_from_url_or_key(archivo.ruta_descarga))
+        if por_categoria:
+            base = f"{archivo.tipo_archivo.tipo if archivo.tipo_archivo else 'Desconocido'}/{base}"
+        nombre, n = base, 1
+        while nombre in usados:
+            raiz, ext = os.path.splitext(base)
+            nombre, n = f"{raiz} ({n}){ext}", n + 1
+        usados.add(nombre)
+        yield archivo, nombre
+
+
+def _zip_en_stream(entradas):
+    """
+    Genera el ZIP de `entradas` [(nombre_en_zip, key_s3, fecha)] chunk a chunk.
+    Mientras se escribe un objeto se abre el siguiente en un hilo aparte; en
+    memoria solo quedan el chunk actual, el primero del siguiente y el buffer
+    del compresor. Los objetos que fallan se listan en ERRORES.txt al final.
+    """
+    salida = _SalidaZip()
+    errores = []
+    prefetch = ThreadPoolExecutor(max_workers=1)
+    siguiente = prefetch.submit(_abrir_entrada_zip, entradas[0][1]) if entradas else None
+    try:
+        with zipfile.ZipFile(salida, 'w', allowZip64=True) as zf:
+            for i, (nombre, key_s3, fecha) in enumerate(entradas):
+                body, metadata, chunk, error = siguiente.result()
+                siguiente = None
+                if i + 1 < len(entradas):
+                    siguiente = prefetch.submit(_abrir_entrada_zip, entradas[i + 1][1])
+                if error:
+                    errores.append(f"{nombre}: {error}")
+                    continue
+
+                fecha = metadata.get('last_modified') or fecha
+                info = zipfile.ZipInfo(nombre, date_time=fecha.timetuple()[:6] if fecha else (1980, 1, 1, 0, 0, 0))
+                comprimido = os.path.splitext(nombre)[1].lower() in EXTENSIONES_COMPRIMIDAS
+                info.compress_type = zipfile.ZIP_STORED if comprimido else zipfile.ZIP_DEFLATED
+                info.file_size = metadata.get('content_length') or 0
+                try:
+                    with zf.open(info, 'w') as destino:
+                        while chunk:
+                            destino.write(chunk)
+                            datos = salida.vaciar()
+                            if datos:
+                                yield datos
+                            chunk = body.read(ZIP_CHUNK_SIZE)
+                finally:
+                    body.close()
+
+            if errores:
+                zf.writestr('ERRORES.txt', '\n'.join(errores) + '\n')
+        yield salida.vaciar()
+        print(f"[ZIP_STREAM] archivos={len(entradas)} errores={len(errores)}")
+    finally:
+        # Si el cliente corta la descarga, cerrar el objeto que se estaba precargando
+        if siguiente is not None:
+            body = siguiente.result()[0]
+            if body is not None:
+                body.close()
+        prefetch.shutdown(wait=False)
+
+
+@routes.route('/api/productor/<cod_productor>/archivos.zip', methods=['GET'])
+def descargar_archivos_zip(cod_productor):
+    categoria = request.args.get('categoria')
+    productor = Usuario.query.filter_by(cod_productor=cod_productor.strip()).first()
+    if not productor:
+        return jsonify({'error': 'Productor no encontrado'}), 404
+
+    archivos = _archivos_de_productor(productor, categoria).order_by(Archivo.id_archivo).all()
+    if not archivos:
+        return jsonify({'error': 'No hay archivos para descargar'}), 404
+
+    entradas = [
+        (nombre, _s3_key_from_url_or_key(archivo.ruta_descarga), archivo.fecha_subida)
+        for archivo, nombre in _nombres_zip(archivos, por_categoria=not categoria)
+    ]
+    nombre_zip = f"{productor.cod_productor}{'_' + categoria if categoria else ''}.zip"
+    response = Response(
+        stream_with_context(_zip_en_stream(entradas)),
+        mimetype='application/zip',
+        direct_passthrough=True,
     )
+    response.headers['Content-Disposition'] = _content_disposition(secure_filename(nombre_zip) or 'archivos.zip')
+    return response
 
 
 @routes.route('/api/eliminar_archivo', methods=['DELETE'])
@@ -1042,6 +1765,76 @@ def eliminar_archivo_activo():
         return jsonify({"msg": f"Error interno del servidor: {str(e)}"}), 500
 
 
+@routes.route('/api/eliminar_archivos', methods=['DELETE'])
+def eliminar_archivos_masivo():
+    """
+    Elimina varios archivos: por lista `ids` (id_archivo) o por filtro
+    `productorId` (+ `tipoArchivo` opcional). Borra en S3 con DeleteObjects y
+    las filas cuyo objeto se pudo borrar en una sola sentencia.
+    """
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    cod_productor = data.get('productorId')
+    tipo_archivo_id = data.get('tipoArchivo')
+
+    consulta = db.session.query(Archivo.id_archivo, Archivo.nombre, Archivo.ruta_descarga)
+    if ids:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({"msg": "ids debe ser una lista de enteros"}), 400
+        consulta = consulta.filter(Archivo.id_archivo.in_(ids))
+    elif cod_productor:
+        productor = Usuario.query.filter_by(cod_productor=cod_productor).first()
+        if not productor:
+            return jsonify({"msg": "Productor no encontrado"}), 404
+        consulta = consulta.filter(Archivo.us_asociado == productor.id_usuario)
+        if tipo_archivo_id:
+            consulta = consulta.filter(Archivo.TipoArchivo == tipo_archivo_id)
+    else:
+        return jsonify({"msg": "Se requiere ids o productorId"}), 400
+
+    archivos = consulta.all()
+    if not archivos:
+        return jsonify({"msg": "No se encontraron archivos", "eliminados": 0, "archivos": []}), 404
+
+    errores_s3 = eliminar_archivos_de_s3([a.ruta_descarga for a in archivos])
+    borrar = [a.id_archivo for a in archivos if errores_s3.get(a.ruta_descarga) is None]
+
+    if borrar:
+        try:
+            db.session.execute(delete(ArchivoPoligono).where(ArchivoPoligono.id_archivo.in_(borrar)))
+            db.session.execute(delete(Archivo).where(Archivo.id_archivo.in_(borrar)))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"msg": f"Error interno del servidor: {str(e)}"}), 500
+
+    resultados = [
+        {
+            "id_archivo": a.id_archivo,
+            "nombre": a.nombre,
+            "key": _s3_key_from_url_or_key(a.ruta_descarga),
+            "ok": errores_s3.get(a.ruta_descarga) is None,
+            **({"msg": errores_s3[a.ruta_descarga]} if errores_s3.get(a.ruta_descarga) else {}),
+        }
+        for a in archivos
+    ]
+    if ids:
+        encontrados = {a.id_archivo for a in archivos}
+        resultados += [
+            {"id_archivo": i, "ok": False, "msg": "Archivo no encontrado"}
+            for i in dict.fromkeys(ids) if i not in encontrados
+        ]
+
+    print(f"[ELIMINACION_MASIVA] encontrados={len(archivos)} eliminados={len(borrar)}")
+    if len(borrar) == len(resultados):
+        status = 200
+    elif borrar:
+        status = 207
+    else:
+        status = 500
+    return jsonify({"eliminados": len(borrar), "total": len(resultados), "archivos": resultados}), status
+
+
 @routes.route('/api/subir_kml', methods=['POST'])
 def subir_kml_activo():
     if 'archivo' not in request.files:
@@ -1055,7 +1848,7 @@ def subir_kml_activo():
         return jsonify({"msg": "No se ha seleccionado ningun archivo KML"}), 400
 
     filename = secure_filename(archivo_kml.filename)
-    if not filename.lower().endswith('.kml'):
+    if not filename.lower().endswith(('.kml', '.kmz')):
         return jsonify({"msg": "El archivo subido no es un archivo KML"}), 400
 
     productor = Usuario.query.filter_by(cod_productor=cod_productor).first()
@@ -1063,9 +1856,12 @@ def subir_kml_activo():
         return jsonify({"msg": "Productor no encontrado"}), 404
 
     ruta_s3 = f"{cod_productor}/kml/{filename}"
-    kml_data = archivo_kml.read()
-    archivo_kml.seek(0)
-    geojson_data = kml_to_geojson(kml_data)
+    try:
+        geojson_data = kml_to_geojson(archivo_kml.stream)
+    except (ET.ParseError, zipfile.BadZipFile, ValueError):
+        # ValueError: coordenadas no numericas
+        return jsonify({"msg": "El archivo KML no es valido"}), 400
+    archivo_kml.stream.seek(0)
     mensaje = subir_archivo_a_s3(archivo_kml, ruta_s3)
 
     if "exitosamente" not in mensaje:
@@ -1073,11 +1869,19 @@ def subir_kml_activo():
 
     kml_existente = KML.query.filter_by(us_asociado=productor.id_usuario).first()
     ruta_archivo = f'https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/{ruta_s3}'
+    geojson_texto, geojson_etag = serializar_geojson(enriquecer_geojson(geojson_data))
 
     if kml_existente:
         kml_existente.ruta_archivo = ruta_archivo
+        kml_existente.geojson = geojson_texto
+        kml_existente.geojson_etag = geojson_etag
     else:
-        db.session.add(KML(ruta_archivo=ruta_archivo, us_asociado=productor.id_usuario))
+        db.session.add(KML(
+            ruta_archivo=ruta_archivo,
+            us_asociado=productor.id_usuario,
+            geojson=geojson_texto,
+            geojson_etag=geojson_etag,
+        ))
 
     db.session.commit()
     return jsonify({
@@ -1087,6 +1891,7 @@ def subir_kml_activo():
 
 
 @routes.route('/api/productor/kml', methods=['GET'])
+@coalescido()
 def obtener_kml_por_productor_activo():
     cod_productor = request.args.get('cod_productor')
     if not cod_productor:
@@ -1108,3 +1913,145 @@ def obtener_kml_por_productor_activo():
         'cod_productor': productor.cod_productor,
         'kmls': [kml.serialize() for kml in kmls]
     }), 200
+
+
+@routes.route('/api/productor/kml/poligonos', methods=['GET'])
+def obtener_archivos_por_poligono():
+    """Archivos del productor agrupados por KML y por poligono (cuadro)."""
+    cod_productor = request.args.get('cod_productor')
+    if not cod_productor:
+        return jsonify({'error': 'Codigo del productor no proporcionado'}), 400
+
+    productor = Usuario.query.filter_by(cod_productor=cod_productor.strip()).first()
+    if not productor:
+        return jsonify({'error': 'Productor no encontrado'}), 404
+
+    filas = (
+        db.session.query(ArchivoPoligono.poligono, Archivo)
+        .join(Archivo, Archivo.id_archivo == ArchivoPoligono.id_archivo)
+        .filter(Archivo.us_asociado == productor.id_usuario)
+        .order_by(Archivo.id_archivo)
+        .all()
+    )
+
+    kmls = {}
+    for poligono, archivo in filas:
+        archivo_data = archivo.serialize()
+        archivo_data['ruta_descarga_app'] = f"/api/archivo/{archivo.id_archivo}/descargar"
+        kmls.setdefault(str(archivo.kml_asociado), {}).setdefault(poligono, []).append(archivo_data)
+
+    return jsonify({
+        'productor': productor.nombre,
+        'cod_productor': productor.cod_productor,
+        'kmls': kmls
+    }), 200
+
+
+def _materializar_geojson(kml):
+    """Parsea y guarda el GeoJSON de un KML subido antes de que se precalculara."""
+    buffer, _ = descargar_archivo_de_s3(_s3_key_from_url_or_key(kml.ruta_archivo))
+    kml.geojson, kml.geojson_etag = serializar_geojson(
+        enriquecer_geojson(kml_to_geojson(buffer.getvalue()))
+    )
+
+
+ETAG_SUFIJO_GZIP = '-gzip'
+
+
+def _etag_coincidente(etag):
+    """
+    El ETag (de la version identity o de la gzip) que coincide con If-None-Match,
+    o None. Cada codificacion tiene su propio ETag fuerte: un cache o un Range
+    nunca mezclan bytes de una con la otra.
+    """
+    for candidato in (etag, etag + ETAG_SUFIJO_GZIP):
+        if request.if_none_match.contains_weak(candidato):
+            return candidato
+    return None
+
+
+def _respuesta_con_etag(cuerpo, etag, mimetype='application/json'):
+    """Respuesta con ETag fuerte, 304 si coincide If-None-Match (comparacion debil) y gzip si se acepta."""
+    coincidente = _etag_coincidente(etag)
+    if coincidente:
+        response = Response(status=304)
+        response.set_etag(coincidente)
+        return response
+
+    datos = cuerpo.encode('utf-8') if isinstance(cuerpo, str) else cuerpo
+    response = Response(mimetype=mimetype)
+    if 'gzip' in request.accept_encodings and len(datos) > 1024:
+        datos = gzip.compress(datos, compresslevel=6)
+        response.headers['Content-Encoding'] = 'gzip'
+        etag += ETAG_SUFIJO_GZIP
+    response.set_data(datos)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@routes.route('/api/productor/kml/geojson', methods=['GET'])
+def obtener_geojson_kml():
+    cod_productor = request.args.get('cod_productor')
+    if not cod_productor:
+        return jsonify({'error': 'Codigo del productor no proporcionado'}), 400
+
+    productor = Usuario.query.filter_by(cod_productor=cod_productor.strip()).first()
+    if not productor:
+        return jsonify({'error': 'Productor no encontrado'}), 404
+
+    query = KML.query.filter_by(us_asociado=productor.id_usuario).options(lazyload(KML.archivos))
+    id_kml = request.args.get('id_kml', type=int)
+    if id_kml is not None:
+        query = query.filter_by(id_kml=id_kml)
+    kmls = query.order_by(KML.id_kml).all()
+    if not kmls:
+        return jsonify({'error': 'KML no encontrado'}), 404
+
+    # Un KML que no se puede materializar (no esta en S3, o es invalido) se
+    # omite: los demas se siguen mostrando y el fallido se reintenta en el
+    # proximo GET.
+    errores = {}
+    pendientes = [kml for kml in kmls if not kml.geojson_etag]
+    for kml in pendientes:
+        try:
+            _materializar_geojson(kml)
+        except S3ServiceError as e:
+            errores[kml.id_kml] = (e.message, e.status_code)
+        except (ET.ParseError, zipfile.BadZipFile, ValueError):
+            errores[kml.id_kml] = ("El KML almacenado no es valido", 422)
+    if pendientes:
+        db.session.commit()
+
+    if len(errores) == len(kmls):
+        mensaje, status = next(iter(errores.values()))
+        return jsonify({"error": mensaje}), status
+    if errores:
+        print(f"[KML_GEOJSON] {cod_productor}: se omiten los KML {sorted(errores)}: {errores}")
+
+    if len(kmls) == 1:
+        etag = kmls[0].geojson_etag
+        # El cuerpo (deferred) solo se lee si el cliente no tiene la version actual
+        if _etag_coincidente(etag):
+            return _respuesta_con_etag(None, etag)
+        return _respuesta_con_etag(kmls[0].geojson, etag, mimetype='application/geo+json')
+
+    etag = hashlib.sha256(
+        '|'.join(kml.geojson_etag or f'omitido:{kml.id_kml}' for kml in kmls).encode('utf-8')
+    ).hexdigest()
+    if _etag_coincidente(etag):
+        response = _respuesta_con_etag(None, etag)
+    else:
+        features = []
+        for kml in kmls:
+            if kml.id_kml in errores:
+                continue
+            for feature in json.loads(kml.geojson).get('features', []):
+                feature.setdefault('properties', {})['id_kml'] = kml.id_kml
+                features.append(feature)
+        cuerpo = json.dumps({'type': 'FeatureCollection', 'features': features}, separators=(',', ':'))
+        response = _respuesta_con_etag(cuerpo, etag, mimetype='application/geo+json')
+    if errores:
+        response.headers['X-KML-Omitidos'] = ','.join(str(id_kml) for id_kml in sorted(errores))
+    return response
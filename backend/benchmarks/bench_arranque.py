@@ -0,0 +1,90 @@
+"""
+Costo de arranque: tiempo de `import app` en un proceso nuevo (lo que paga
+cada worker sin preload y el master con preload) y que SDKs pesados quedan
+cargados despues de importar.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_arranque --repeticiones 10
+    python -m benchmarks.bench_arranque --modulo app_routes --json
+
+Para comparar con otro commit, correrlo desde un worktree de ese commit:
+    git worktree add /tmp/antes <commit> && cd /tmp/antes/backend && \
+        python <este repo>/backend/benchmarks/bench_arranque.py --dropbox-token x
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SDKS = ('boto3', 'botocore.client', 's3transfer', 'dropbox', 'awscrt')
+
+CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+segundos = time.perf_counter() - inicio
+print(json.dumps({{'segundos': segundos, 'sdks': [m for m in {sdks!r} if m in sys.modules]}}))
+"""
+
+
+def medir(modulo, repeticiones, dropbox_token=None):
+    entorno = dict(os.environ)
+    # Por defecto sin credenciales de Dropbox: el import no deberia fallar por eso
+    for variable in ('DROPBOX_ACCESS_TOKEN', 'DROPBOX_REFRESH_TOKEN', 'DROPBOX_APP_KEY', 'DROPBOX_APP_SECRET'):
+        entorno.pop(variable, None)
+    if dropbox_token:
+        entorno['DROPBOX_ACCESS_TOKEN'] = dropbox_token
+    entorno.setdefault('DATABASE_URL', 'sqlite://')
+    entorno.setdefault('JWT_SECRET_KEY', 'bench')
+
+    tiempos, sdks, error = [], [], None
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-c', CODIGO.format(modulo=modulo, sdks=SDKS)],
+            capture_output=True, text=True, env=entorno,
+        )
+        if proceso.returncode != 0:
+            error = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else 'error'
+            break
+        resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+        tiempos.append(resultado['segundos'] * 1000)
+        sdks = resultado['sdks']
+
+    if error:
+        return {'modulo': modulo, 'error': error}
+    return {
+        'modulo': modulo,
+        'repeticiones': repeticiones,
+        'import_ms': {
+            'mediana': round(statistics.median(tiempos), 1),
+            'min': round(min(tiempos), 1),
+            'max': round(max(tiempos), 1),
+        },
+        'sdks_cargados': sdks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modulo', default='app')
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--dropbox-token', help='token falso, para medir versiones que lo exigen al importar')
+    parser.add_argument('--json', action='store_true', help='salida en JSON')
+    args = parser.parse_args()
+
+    resultado = medir(args.modulo, args.repeticiones, args.dropbox_token)
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+    elif 'error' in resultado:
+        print(f"import {args.modulo} fallo: {resultado['error']}")
+    else:
+        print(f"import {args.modulo}: mediana {resultado['import_ms']['mediana']} ms "
+              f"(min {resultado['import_ms']['min']}, max {resultado['import_ms']['max']}, "
+              f"{args.repeticiones} procesos)")
+        print(f"SDKs cargados: {', '.join(resultado['sdks_cargados']) or 'ninguno'}")
+
+
+if __name__ == '__main__':
+    main()
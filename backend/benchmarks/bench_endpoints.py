@@ -0,0 +1,258 @@
+"""
+Benchmark de las rutas calientes de la app, en proceso, contra una base
+sembrada, S3 local (moto o MinIO) y un Dropbox falso en memoria.
+
+Rutas: /api/productor/archivos, /api/productor/kml (y /geojson de los KML
+grandes), /api/archivo/<id>/descargar, /upload y /list. Por ruta reporta latencia
+(p50/p95/p99), queries SQL por request y RSS pico del proceso, en JSON para
+comparar entre commits.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_endpoints --salida bench.json
+    python -m benchmarks.bench_endpoints --productores 500 --archivos 50000 --comparar base.json
+    python -m benchmarks.bench_endpoints --database-url postgresql://... \\
+        --endpoint-url http://localhost:9000 --bucket bench
+
+Con SQLite crea una base temporal; con --database-url crea las tablas en esa
+base (tiene que ser descartable). Sin --endpoint-url usa moto en memoria.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+LOTE = 20000
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def _rss_pico_mb():
+    # ru_maxrss esta en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _commit_actual():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def sembrar(app, args, bucket):
+    """Carga productores, KMLs (algunos grandes, con GeoJSON precalculado) y archivos."""
+    from sqlalchemy import insert
+
+    import s3_service
+    from benchmarks.bench_kml import generar_kml
+    from kml_service import kml_a_geojson, serializar_geojson
+    from models import db, Usuario, TipoUsuario, KML, Archivo, ArchivoPoligono, TipoArchivo
+
+    rnd = random.Random(42)
+    prefijo = f"https://{bucket}.s3.{s3_service.Config.S3_REGION}.amazonaws.com/"
+    geojson, etag = serializar_geojson(kml_a_geojson(generar_kml(args.placemarks, args.vertices)))
+
+    with app.app_context():
+        db.create_all()
+        conn = db.session.connection()
+        conn.execute(insert(TipoUsuario.__table__), [{'id_tipo': 1, 'tipo': 'Productor'}])
+        conn.execute(insert(TipoArchivo.__table__), [
+            {'id_tipo_archivo': i, 'tipo': tipo}
+            for i, tipo in enumerate(['Informes', 'Mapas', 'Taipas', 'Analisis', 'Otros'], start=1)
+        ])
+        conn.execute(insert(Usuario.__table__), [
+            {'id_usuario': i, 'nom_us': f'u{i}', 'pass_us': 'x', 'nombre': f'Productor {i}',
+             'cod_productor': f'P{i:06d}', 'tipo_us': 1}
+            for i in range(1, args.productores + 1)
+        ])
+        # Uno de cada 10 productores tiene un KML grande
+        conn.execute(insert(KML.__table__), [
+            {'id_kml': i, 'ruta_archivo': f'{prefijo}P{i:06d}/kml/campo.kml', 'us_asociado': i,
+             'geojson': geojson if i % 10 == 1 else None, 'geojson_etag': etag if i % 10 == 1 else None}
+            for i in range(1, args.productores + 1)
+        ])
+        for inicio in range(0, args.archivos, LOTE):
+            filas, poligonos = [], []
+            for n in range(inicio, min(inicio + LOTE, args.archivos)):
+                productor = rnd.randint(1, args.productores)
+                tipo = n % 5 + 1
+                nombre = f'informe_{n}_C{n % 40}.pdf'
+                filas.append({
+                    'id_archivo': n + 1, 'nombre': nombre, 'us_asociado': productor, 'TipoArchivo': tipo,
+                    'kml_asociado': productor, 'ruta_descarga': f'{prefijo}P{productor:06d}/Tipo{tipo}/{nombre}',
+                })
+                poligonos.append({'id_archivo': n + 1, 'poligono': str(n % 40)})
+            conn.execute(insert(Archivo.__table__), filas)
+            conn.execute(insert(ArchivoPoligono.__table__), poligonos)
+        db.session.commit()
+
+        # Solo los archivos que se van a descargar existen en S3
+        cliente = s3_service.obtener_cliente()
+        contenido = os.urandom(args.kb_descarga * 1024)
+        ids_descarga = rnd.sample(range(1, args.archivos + 1), min(args.objetos_s3, args.archivos))
+        for archivo in Archivo.query.filter(Archivo.id_archivo.in_(ids_descarga)):
+            cliente.put_object(Bucket=bucket, Key=archivo.ruta_descarga[len(prefijo):], Body=contenido)
+    return ids_descarga
+
+
+def medir(app, nombre, hacer_request, repeticiones):
+    from instrumentacion import contar_queries
+
+    latencias, queries, errores = [], [], 0
+    for i in range(repeticiones):
+        with app.app_context(), contar_queries() as contador:
+            inicio = time.perf_counter()
+            respuesta = hacer_request(i)
+            respuesta.get_data()  # consume los streams
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        queries.append(contador.total)
+        if respuesta.status_code >= 400:
+            errores += 1
+    resultado = {
+        'requests': repeticiones,
+        'errores': errores,
+        'latencia_ms': {
+            'media': round(statistics.mean(latencias), 2),
+            'p50': round(_percentil(latencias, 50), 2),
+            'p95': round(_percentil(latencias, 95), 2),
+            'p99': round(_percentil(latencias, 99), 2),
+        },
+        'queries_por_request': {'media': round(statistics.mean(queries), 2), 'max': max(queries)},
+        'rss_pico_mb': _rss_pico_mb(),
+    }
+    print(f"{nombre:<32}p50={resultado['latencia_ms']['p50']:>9.2f}ms "
+          f"p95={resultado['latencia_ms']['p95']:>9.2f}ms "
+          f"queries={resultado['queries_por_request']['media']:>6.1f} "
+          f"rss={resultado['rss_pico_mb']:>7.1f}MB errores={errores}", file=sys.stderr)
+    return resultado
+
+
+def comparar(base, actual):
+    print(f"\n{'ruta':<32}{'p50 base':>10}{'p50 actual':>12}{'cambio':>9}", file=sys.stderr)
+    for ruta, datos in actual['rutas'].items():
+        anterior = base.get('rutas', {}).get(ruta)
+        if not anterior:
+            continue
+        p50_base, p50 = anterior['latencia_ms']['p50'], datos['latencia_ms']['p50']
+        cambio = (p50 / p50_base - 1) * 100 if p50_base else 0.0
+        print(f"{ruta:<32}{p50_base:>10.2f}{p50:>12.2f}{cambio:>+8.1f}%", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url')
+    parser.add_argument('--endpoint-url', help='S3 compatible local (MinIO); por defecto moto')
+    parser.add_argument('--bucket', default='bench-endpoints')
+    parser.add_argument('--productores', type=int, default=300)
+    parser.add_argument('--archivos', type=int, default=30000)
+    parser.add_argument('--placemarks', type=int, default=500, help='placemarks de los KML grandes')
+    parser.add_argument('--vertices', type=int, default=200)
+    parser.add_argument('--objetos-s3', type=int, default=200, help='archivos con objeto en S3 para descargar')
+    parser.add_argument('--kb-descarga', type=int, default=512)
+    parser.add_argument('--archivos-dropbox', type=int, default=2000, help='entradas de la carpeta de /list')
+    parser.add_argument('--kb-upload', type=int, default=256)
+    parser.add_argument('--latencia-dropbox', type=float, default=0.0, help='segundos simulados por llamada')
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--salida', help='archivo JSON de resultados (por defecto stdout)')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar p50')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_endpoints.sqlite')}"
+    os.environ.setdefault('JWT_SECRET_KEY', 'bench')
+    os.environ.setdefault('DROPBOX_ACCESS_TOKEN', 'bench')
+    os.environ['S3_BUCKET_NAME'] = args.bucket
+    os.environ.setdefault('S3_REGION', 'us-east-1')
+    if args.endpoint_url:
+        os.environ['S3_ENDPOINT_URL'] = args.endpoint_url
+        entorno = contextlib.nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        entorno = mock_aws()
+
+    with entorno, contextlib.redirect_stdout(sys.stderr):
+        # Los print() de los servicios van a stderr: stdout queda para el JSON
+        import dropbox_service
+        import s3_service
+        from app import app
+        from benchmarks.fake_dropbox import FakeDropbox
+
+        s3_service.Config.S3_BUCKET_NAME = args.bucket
+        s3_service.Config.S3_ENDPOINT_URL = args.endpoint_url
+        s3_service.reiniciar_cliente()
+        if not args.endpoint_url:
+            s3_service.obtener_cliente().create_bucket(Bucket=args.bucket)
+        fake_dropbox = FakeDropbox(latencia=args.latencia_dropbox)
+        dropbox_service.usar_cliente(fake_dropbox)
+        for i in range(args.archivos_dropbox):
+            fake_dropbox._guardar(f'/bench/lista/archivo_{i}.pdf', b'x')
+
+        inicio = time.perf_counter()
+        ids_descarga = sembrar(app, args, args.bucket)
+        segundos_siembra = time.perf_counter() - inicio
+        print(f"Sembrados {args.productores} productores y {args.archivos} archivos "
+              f"en {segundos_siembra:.1f}s (rss={_rss_pico_mb()}MB)", file=sys.stderr)
+
+        rnd = random.Random(7)
+        productores = [f'P{rnd.randint(1, args.productores):06d}' for _ in range(args.repeticiones)]
+        contenido_upload = os.urandom(args.kb_upload * 1024)
+        cliente = app.test_client()
+
+        rutas = {
+            '/api/productor/archivos': lambda i: cliente.get(
+                f'/api/productor/archivos?cod_productor={productores[i]}'),
+            '/api/productor/kml': lambda i: cliente.get(
+                f'/api/productor/kml?cod_productor={productores[i]}'),
+            # Productores con KML grande (ver sembrar)
+            '/api/productor/kml/geojson': lambda i: cliente.get(
+                f'/api/productor/kml/geojson?cod_productor=P{(i * 10) % args.productores + 1:06d}'),
+            '/api/archivo/<id>/descargar': lambda i: cliente.get(
+                f'/api/archivo/{ids_descarga[i % len(ids_descarga)]}/descargar'),
+            '/upload': lambda i: cliente.post('/upload', data={
+                'path': f'/bench/subidas/archivo_{i}.pdf',
+                'file': (io.BytesIO(contenido_upload), f'archivo_{i}.pdf'),
+            }, content_type='multipart/form-data'),
+            '/list': lambda i: cliente.get('/list?folder=/bench/lista'),
+        }
+        resultados = {nombre: medir(app, nombre, fn, args.repeticiones) for nombre, fn in rutas.items()}
+
+    salida = {
+        'commit': _commit_actual(),
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'base': 'postgresql' if args.database_url and args.database_url.startswith('postgres') else
+                (args.database_url.split(':', 1)[0] if args.database_url else 'sqlite'),
+        's3': args.endpoint_url or 'moto',
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar', 'database_url')},
+        'siembra_s': round(segundos_siembra, 2),
+        'rutas': resultados,
+    }
+    texto = json.dumps(salida, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(json.load(f), salida)
+
+
+if __name__ == '__main__':
+    main()
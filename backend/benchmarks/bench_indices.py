@@ -0,0 +1,124 @@
+"""
+Benchmark de los indices de b71c3e9f5d02: latencia de las busquedas mas
+frecuentes de los endpoints, sin y con indices, sobre tablas sembradas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_indices --filas 1000000
+    python -m benchmarks.bench_indices --database-url postgresql://... --filas 1000000
+
+Con SQLite crea una base temporal; con otra URL usa tablas existentes vacias
+(correr contra una base descartable).
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+
+from models import db, Usuario, TipoUsuario, KML, Archivo, TipoArchivo
+
+INDICES = [
+    ('usuarios', 'ix_usuarios_cod_productor', 'UNIQUE INDEX', '(cod_productor)'),
+    ('archivos', 'ix_archivos_us_asociado', 'INDEX', '(us_asociado)'),
+    ('archivos', 'ix_archivos_us_asociado_TipoArchivo', 'INDEX', '(us_asociado, "TipoArchivo")'),
+    ('archivos', 'ix_archivos_nombre', 'INDEX', '(nombre)'),
+    ('kml', 'ix_kml_us_asociado', 'INDEX', '(us_asociado)'),
+]
+
+LOTE = 20000
+
+
+def sembrar(engine, filas, productores):
+    tablas = [TipoUsuario.__table__, Usuario.__table__, KML.__table__, TipoArchivo.__table__, Archivo.__table__]
+    db.metadata.create_all(engine, tables=tablas)
+    with engine.begin() as conn:
+        conn.execute(insert(TipoUsuario.__table__), [{'id_tipo': 1, 'tipo': 'Productor'}])
+        conn.execute(insert(TipoArchivo.__table__), [{'id_tipo_archivo': i, 'tipo': f'Tipo{i}'} for i in range(1, 11)])
+        conn.execute(insert(Usuario.__table__), [
+            {'id_usuario': i, 'nom_us': f'u{i}', 'pass_us': 'x', 'nombre': f'Productor {i}',
+             'cod_productor': f'P{i:06d}', 'tipo_us': 1}
+            for i in range(1, productores + 1)
+        ])
+        conn.execute(insert(KML.__table__), [
+            {'id_kml': i, 'ruta_archivo': f'P{i:06d}/kml/campo.kml', 'us_asociado': i}
+            for i in range(1, productores + 1)
+        ])
+        for inicio in range(0, filas, LOTE):
+            conn.execute(insert(Archivo.__table__), [
+                {'nombre': f'informe_{n}_C{n % 40}.zip', 'ruta_descarga': f'P/x/informe_{n}.zip',
+                 'us_asociado': n % productores + 1, 'TipoArchivo': n % 10 + 1, 'kml_asociado': n % productores + 1}
+                for n in range(inicio, min(inicio + LOTE, filas))
+            ])
+
+
+def consultas(productores, filas):
+    rnd = random.Random(42)
+    return {
+        'usuario por cod_productor': lambda: select(Usuario.__table__).where(
+            Usuario.__table__.c.cod_productor == f'P{rnd.randint(1, productores):06d}'),
+        'archivos por us_asociado': lambda: select(Archivo.__table__).where(
+            Archivo.__table__.c.us_asociado == rnd.randint(1, productores)),
+        'archivos por (us_asociado, TipoArchivo)': lambda: select(Archivo.__table__).where(
+            Archivo.__table__.c.us_asociado == rnd.randint(1, productores),
+            Archivo.__table__.c.TipoArchivo == rnd.randint(1, 10)),
+        'archivo por nombre': lambda: select(Archivo.__table__).where(
+            Archivo.__table__.c.nombre == f'informe_{(n := rnd.randrange(filas))}_C{n % 40}.zip').limit(1),
+        'kml por us_asociado': lambda: select(KML.__table__).where(
+            KML.__table__.c.us_asociado == rnd.randint(1, productores)),
+    }
+
+
+def medir(engine, productores, filas, repeticiones):
+    resultados = {}
+    with engine.connect() as conn:
+        for nombre, construir in consultas(productores, filas).items():
+            tiempos = []
+            for _ in range(repeticiones):
+                stmt = construir()
+                inicio = time.perf_counter()
+                conn.execute(stmt).fetchall()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            resultados[nombre] = statistics.median(tiempos)
+    return resultados
+
+
+def cambiar_indices(engine, crear):
+    with engine.begin() as conn:
+        for tabla, nombre, tipo, columnas in INDICES:
+            if crear:
+                conn.exec_driver_sql(f'CREATE {tipo} IF NOT EXISTS "{nombre}" ON {tabla} {columnas}')
+            else:
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{nombre}"')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url')
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--productores', type=int, default=2000)
+    parser.add_argument('--repeticiones', type=int, default=50)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indices.sqlite')}"
+    engine = create_engine(url)
+
+    inicio = time.perf_counter()
+    sembrar(engine, args.filas, args.productores)
+    print(f"Sembradas {args.filas} filas en archivos ({args.productores} productores) "
+          f"en {time.perf_counter() - inicio:.1f}s")
+
+    cambiar_indices(engine, crear=False)
+    sin_indices = medir(engine, args.productores, args.filas, args.repeticiones)
+    cambiar_indices(engine, crear=True)
+    con_indices = medir(engine, args.productores, args.filas, args.repeticiones)
+
+    print(f"{'consulta':<42}{'sin indice (ms)':>17}{'con indice (ms)':>17}")
+    for nombre in sin_indices:
+        print(f"{nombre:<42}{sin_indices[nombre]:>17.3f}{con_indices[nombre]:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark del parser KML: kml_service.kml_a_geojson (iterparse) contra el
+kml_to_geojson original (ET.fromstring + find por placemark).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_kml --placemarks 2000 --vertices 200
+"""
+import argparse
+import json
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from kml_service import kml_a_geojson
+
+
+def kml_to_geojson_original(kml_data):
+    """Copia de la implementacion anterior de app_routes.kml_to_geojson."""
+    kml_tree = ET.ElementTree(ET.fromstring(kml_data))
+    root = kml_tree.getroot()
+
+    ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+
+    geojson_features = []
+    for placemark in root.findall('.//kml:Placemark', ns):
+        geometry = placemark.find('.//kml:Polygon//kml:coordinates', ns)
+        if geometry is not None:
+            coordinates = geometry.text.strip().split(' ')
+            coords = [[float(coord.split(',')[0]), float(coord.split(',')[1])] for coord in coordinates]
+            feature = {
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'Polygon',
+                    'coordinates': [coords]
+                },
+                'properties': {
+                    'name': placemark.find('.//kml:name', ns).text if placemark.find('.//kml:name', ns) is not None else 'Unnamed'
+                }
+            }
+            geojson_features.append(feature)
+
+    return {
+        'type': 'FeatureCollection',
+        'features': geojson_features
+    }
+
+
+def generar_kml(placemarks, vertices):
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>',
+              '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>']
+    for i in range(placemarks):
+        x0 = -56.0 + (i % 100) * 0.01
+        y0 = -33.0 + (i // 100) * 0.01
+        anillo = ' '.join(
+            f'{x0 + 0.004 * (j / vertices):.7f},{y0 + 0.004 * ((j * 7919) % vertices) / vertices:.7f},0'
+            for j in range(vertices)
+        )
+        partes.append(
+            f'<Placemark><name>{i}</name><Polygon><outerBoundaryIs><LinearRing>'
+            f'<coordinates>{anillo}</coordinates></LinearRing></outerBoundaryIs></Polygon></Placemark>'
+        )
+    partes.append('</Document></kml>')
+    return '\n'.join(partes).encode('utf-8')
+
+
+def medir(funcion, datos, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(datos)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion(datos)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, min(tiempos), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--placemarks', type=int, default=2000)
+    parser.add_argument('--vertices', type=int, default=200)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    datos = generar_kml(args.placemarks, args.vertices)
+    print(f"KML sintetico: {args.placemarks} placemarks x {args.vertices} vertices "
+          f"({len(datos) / 1024 / 1024:.1f} MB)")
+
+    original, t_original, m_original = medir(kml_to_geojson_original, datos, args.repeticiones)
+    nuevo, t_nuevo, m_nuevo = medir(kml_a_geojson, datos, args.repeticiones)
+
+    # Mismo resultado una vez serializado (el parser nuevo usa tuplas para las coordenadas)
+    assert json.dumps(original) == json.dumps(nuevo)
+
+    print(f"{'parser':<22}{'tiempo (s)':>12}{'pico memoria (MB)':>20}")
+    print(f"{'kml_to_geojson':<22}{t_original:>12.3f}{m_original / 1024 / 1024:>20.1f}")
+    print(f"{'kml_a_geojson':<22}{t_nuevo:>12.3f}{m_nuevo / 1024 / 1024:>20.1f}")
+    print(f"speedup: {t_original / t_nuevo:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de subidas grandes a S3: upload_fileobj (TransferConfig) contra
+s3_service.subir_multipart con distintas concurrencias y checksum por parte.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_multipart --mb 256
+    python -m benchmarks.bench_multipart --mb 1024 --endpoint-url http://localhost:9000 --bucket bench
+
+Sin --endpoint-url usa moto en memoria (mide sobre todo el costo del lado
+cliente: lectura, checksums e hilos). Con --endpoint-url (MinIO u otro S3
+local) el bucket debe existir y las credenciales salir del entorno.
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+MB = 1024 * 1024
+
+
+def _archivo_temporal(tamano):
+    archivo = tempfile.TemporaryFile()
+    bloque = os.urandom(MB)
+    for _ in range(tamano // MB):
+        archivo.write(bloque)
+    archivo.seek(0)
+    return archivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mb', type=int, default=256, help='tamano del archivo de prueba')
+    parser.add_argument('--parte-mb', type=int, default=16)
+    parser.add_argument('--concurrencias', default='1,4,8,16')
+    parser.add_argument('--checksum', default='SHA256', choices=['SHA256', 'CRC32C'])
+    parser.add_argument('--endpoint-url', help='S3 compatible local (MinIO); por defecto moto')
+    parser.add_argument('--bucket', default='bench-multipart')
+    args = parser.parse_args()
+
+    os.environ['S3_BUCKET_NAME'] = args.bucket
+    if args.endpoint_url:
+        os.environ['S3_ENDPOINT_URL'] = args.endpoint_url
+        entorno = contextlib.nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        entorno = mock_aws()
+
+    with entorno:
+        import s3_service
+        from app_config import Config
+
+        Config.S3_BUCKET_NAME = args.bucket
+        Config.S3_ENDPOINT_URL = args.endpoint_url
+        s3_service.reiniciar_cliente()
+        cliente = s3_service.obtener_cliente()
+        if not args.endpoint_url:
+            cliente.create_bucket(Bucket=args.bucket)
+
+        archivo = _archivo_temporal(args.mb * MB)
+        resultados = []
+
+        inicio = time.perf_counter()
+        cliente.upload_fileobj(archivo, args.bucket, 'bench/upload_fileobj.bin',
+                               Config=s3_service.transfer_config())
+        resultados.append(('upload_fileobj', s3_service.transfer_config().max_concurrency,
+                           time.perf_counter() - inicio))
+
+        for concurrencia in (int(c) for c in args.concurrencias.split(',')):
+            archivo.seek(0)
+            inicio = time.perf_counter()
+            s3_service.subir_multipart(
+                archivo, f'bench/multipart_{concurrencia}.bin',
+                tamano_parte=args.parte_mb * MB, concurrencia=concurrencia, checksum=args.checksum,
+            )
+            resultados.append((f'subir_multipart {args.checksum}', concurrencia,
+                               time.perf_counter() - inicio))
+
+        print(f"\nArchivo de {args.mb} MB, partes de {args.parte_mb} MB, "
+              f"destino {'moto' if not args.endpoint_url else args.endpoint_url}")
+        print(f"{'metodo':<26}{'hilos':>7}{'segundos':>11}{'MB/s':>10}")
+        for metodo, hilos, segundos in resultados:
+            print(f"{metodo:<26}{hilos:>7}{segundos:>11.2f}{args.mb / segundos:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Cliente Dropbox falso, en memoria, con la misma interfaz que dropbox.Dropbox
+para las rutas que usa dropbox_service. Devuelve los tipos reales del SDK
+(FileMetadata, ListFolderResult, ...) para que el codigo de la app no note la
+diferencia. Con `latencia` se simula el round-trip de cada llamada a la API.
+
+Uso:
+    import dropbox_service
+    from benchmarks.fake_dropbox import FakeDropbox
+    dropbox_service.usar_cliente(FakeDropbox(latencia=0.02))
+"""
+import hashlib
+import posixpath
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from dropbox.files import (
+    FileMetadata, FolderMetadata, ListFolderResult, UploadSessionStartResult,
+    CreateFolderResult, RelocationResult,
+)
+
+PAGINA_LISTADO = 500
+
+
+class _Respuesta:
+    """Lo que usa dropbox_service de la respuesta HTTP de files_download."""
+
+    def __init__(self, datos):
+        self.content = datos
+
+    def iter_content(self, chunk_size=1024 * 1024):
+        for inicio in range(0, len(self.content), chunk_size):
+            yield self.content[inicio:inicio + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeDropbox:
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.archivos = {}
+        self.carpetas = {'/'}
+        self.sesiones = {}
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def _llamada(self):
+        with self._lock:
+            self.llamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def _metadata(self, path, datos):
+        return FileMetadata(
+            name=posixpath.basename(path),
+            id=f"id:{hashlib.md5(path.encode()).hexdigest()[:16]}",
+            client_modified=datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0),
+            server_modified=datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0),
+            rev=hashlib.md5(datos).hexdigest()[:16],
+            size=len(datos),
+            path_lower=path.lower(),
+            path_display=path,
+        )
+
+    def _guardar(self, path, datos):
+        with self._lock:
+            self.archivos[path.lower()] = (path, datos)
+            carpeta = posixpath.dirname(path.lower())
+            while carpeta not in self.carpetas:
+                self.carpetas.add(carpeta)
+                carpeta = posixpath.dirname(carpeta)
+        return self._metadata(path, datos)
+
+    # --- rutas usadas por dropbox_service ---
+
+    def files_create_folder_v2(self, path, autorename=False):
+        self._llamada()
+        with self._lock:
+            self.carpetas.add(path.lower())
+        return CreateFolderResult(metadata=FolderMetadata(name=posixpath.basename(path), path_lower=path.lower()))
+
+    def files_list_folder(self, path, **kwargs):
+        self._llamada()
+        carpeta = '/' if path in ('', '/') else path.lower().rstrip('/')
+        with self._lock:
+            entradas = [
+                self._metadata(original, datos)
+                for clave, (original, datos) in sorted(self.archivos.items())
+                if posixpath.dirname(clave) == carpeta
+            ]
+            entradas += [
+                FolderMetadata(name=posixpath.basename(c), path_lower=c)
+                for c in sorted(self.carpetas) if c != '/' and posixpath.dirname(c) == carpeta
+            ]
+        return self._pagina(entradas, 0)
+
+    def files_list_folder_continue(self, cursor):
+        self._llamada()
+        entradas, desde = self.sesiones.pop(cursor)
+        return self._pagina(entradas, desde)
+
+    def _pagina(self, entradas, desde):
+        hasta = desde + PAGINA_LISTADO
+        cursor = uuid.uuid4().hex
+        has_more = hasta < len(entradas)
+        if has_more:
+            self.sesiones[cursor] = (entradas, hasta)
+        return ListFolderResult(entries=entradas[desde:hasta], cursor=cursor, has_more=has_more)
+
+    def files_upload(self, f, path, mode=None, **kwargs):
+        self._llamada()
+        return self._guardar(path, bytes(f))
+
+    def files_upload_session_start(self, f, close=False, session_type=None, **kwargs):
+        self._llamada()
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self.sesiones[session_id] = {0: bytes(f)} if f else {}
+        return UploadSessionStartResult(session_id=session_id)
+
+    def files_upload_session_append_v2(self, f, cursor, close=False):
+        self._llamada()
+        with self._lock:
+            self.sesiones[cursor.session_id][cursor.offset] = bytes(f)
+
+    def files_upload_session_finish(self, f, cursor, commit):
+        self._llamada()
+        with self._lock:
+            partes = self.sesiones.pop(cursor.session_id)
+        if f:
+            partes[cursor.offset] = bytes(f)
+        datos = b''.join(partes[offset] for offset in sorted(partes))
+        return self._guardar(commit.path, datos)
+
+    def files_download(self, path, rev=None):
+        self._llamada()
+        original, datos = self.archivos[path.lower()]
+        return self._metadata(original, datos), _Respuesta(datos)
+
+    def files_get_metadata(self, path, **kwargs):
+        self._llamada()
+        original, datos = self.archivos[path.lower()]
+        return self._metadata(original, datos)
+
+    def files_move_v2(self, from_path, to_path, autorename=False, **kwargs):
+        self._llamada()
+        with self._lock:
+            _, datos = self.archivos.pop(from_path.lower())
+        return RelocationResult(metadata=self._guardar(to_path, datos))
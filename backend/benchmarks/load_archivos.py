@@ -0,0 +1,85 @@
+"""
+Prueba de carga de /api/productor/archivos (o cualquier GET) contra un
+servidor ya levantado, p.ej. con gunicorn -c gunicorn.conf.py app:app.
+
+Uso (desde backend/):
+    python -m benchmarks.load_archivos --url http://localhost:3001 \\
+        --cod-productor P000001 --concurrencia 32 --duracion 30
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def correr(url, concurrencia, duracion, timeout):
+    latencias = []
+    errores = []
+    lock = threading.Lock()
+    fin = time.monotonic() + duracion
+
+    def _cliente():
+        propias, propios_errores = [], 0
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as respuesta:
+                    respuesta.read()
+                propias.append((time.perf_counter() - inicio) * 1000)
+            except (urllib.error.URLError, OSError):
+                propios_errores += 1
+        with lock:
+            latencias.extend(propias)
+            errores.append(propios_errores)
+
+    hilos = [threading.Thread(target=_cliente, daemon=True) for _ in range(concurrencia)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    return {
+        'url': url,
+        'concurrencia': concurrencia,
+        'duracion_s': round(transcurrido, 2),
+        'requests': len(latencias),
+        'errores': sum(errores),
+        'req_por_s': round(len(latencias) / transcurrido, 2) if transcurrido else 0.0,
+        'latencia_ms': {
+            'media': round(statistics.mean(latencias), 2) if latencias else 0.0,
+            'p50': round(_percentil(latencias, 50), 2),
+            'p95': round(_percentil(latencias, 95), 2),
+            'p99': round(_percentil(latencias, 99), 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:3001')
+    parser.add_argument('--path', default='/api/productor/archivos')
+    parser.add_argument('--cod-productor', required=True)
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--duracion', type=float, default=30)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    url = f"{args.url.rstrip('/')}{args.path}?cod_productor={args.cod_productor}"
+    print(json.dumps(correr(url, args.concurrencia, args.duracion, args.timeout), indent=2))
+
+
+if __name__ == '__main__':
+    main()
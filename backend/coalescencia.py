@@ -0,0 +1,96 @@
+# coalescencia.py
+import threading
+import time
+
+import instrumentacion
+
+# Una serie por endpoint y resultado: 'lider' ejecuto la vista, 'compartida'
+# recibio el resultado de otro, 'timeout' se canso de esperar y ejecuto por su
+# cuenta. Ratio de coalescencia = compartida / total.
+CONTADOR_COALESCENCIA = instrumentacion.Contador(
+    'app_coalescencia_total', 'Requests por resultado de la coalescencia', ('endpoint', 'resultado'))
+instrumentacion.METRICAS.append(CONTADOR_COALESCENCIA)
+
+
+class _Vuelo:
+    """Una ejecucion en curso para una clave, y lo que esperan sus seguidores."""
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class Coalescedor:
+    """
+    Single-flight por clave, dentro del proceso: mientras hay una ejecucion en
+    curso para una clave, las llamadas con la misma clave la esperan y reciben
+    su resultado (o su excepcion) en lugar de repetir el trabajo. Al terminar
+    no queda nada guardado: no es un cache, solo junta lo que es concurrente.
+
+    El timeout es por clave y se cuenta desde que arranco el lider: un seguidor
+    espera lo que le queda y, si se vence, ejecuta por su cuenta. Un vuelo
+    vencido tampoco acepta seguidores nuevos, el siguiente que llega lo reemplaza.
+    """
+
+    def __init__(self):
+        self._vuelos = {}
+        self._lock = threading.Lock()
+
+    def ejecutar(self, clave, funcion, timeout, grupo='default'):
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            if vuelo is not None and time.monotonic() - vuelo.inicio >= timeout:
+                vuelo = None
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+
+        if lider:
+            CONTADOR_COALESCENCIA.incrementar(grupo, 'lider')
+            try:
+                vuelo.resultado = funcion()
+                return vuelo.resultado
+            except BaseException as e:
+                vuelo.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._vuelos.get(clave) is vuelo:
+                        del self._vuelos[clave]
+                vuelo.listo.set()
+
+        inicio_espera = time.perf_counter()
+        terminado = vuelo.listo.wait(max(0.0, timeout - (time.monotonic() - vuelo.inicio)))
+        instrumentacion.registrar('coalescencia', grupo, time.perf_counter() - inicio_espera)
+        if not terminado:
+            print(f"[COALESCENCIA] timeout esperando {grupo}, se ejecuta sin compartir")
+            CONTADOR_COALESCENCIA.incrementar(grupo, 'timeout')
+            return funcion()
+        CONTADOR_COALESCENCIA.incrementar(grupo, 'compartida')
+        if vuelo.error is not None:
+            raise vuelo.error
+        return vuelo.resultado
+
+    def en_curso(self):
+        with self._lock:
+            return len(self._vuelos)
+
+
+_coalescedor = Coalescedor()
+
+
+def ejecutar(clave, funcion, timeout, grupo='default'):
+    return _coalescedor.ejecutar(clave, funcion, timeout, grupo)
+
+
+def estadisticas():
+    """Por endpoint: lideres, compartidas, timeouts y ratio de coalescencia."""
+    por_grupo = {}
+    for (grupo, resultado), valor in CONTADOR_COALESCENCIA.valores().items():
+        por_grupo.setdefault(grupo, {'lider': 0, 'compartida': 0, 'timeout': 0})[resultado] = valor
+    for conteos in por_grupo.values():
+        total = sum(conteos.values())
+        conteos['ratio'] = (conteos['compartida'] / total) if total else 0.0
+    return {'en_curso': _coalescedor.en_curso(), 'endpoints': por_grupo}
@@ -1,13 +1,26 @@
 # dropbox_service.py
 import os
 import io
+import json
+import hashlib
+import tempfile
+import threading
+import time
 import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-import dropbox
-from dropbox.files import WriteMode, FileMetadata, FolderMetadata, CreateFolderError
-from dropbox.exceptions import ApiError
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+# El SDK de dropbox se importa recién en el primer uso (ver obtener_cliente):
+# importar este módulo no lo carga ni exige credenciales.
 from dotenv import load_dotenv
 
+from instrumentacion import instrumentar_dropbox
+
 load_dotenv(Path(__file__).with_name(".env"))
 
 # --- Preferir refresh token (tokens de corta duración se renuevan solos) ---
@@ -16,21 +29,59 @@ APP_SECRET = os.getenv("DROPBOX_APP_SECRET")
 REFRESH_TOKEN = os.getenv("DROPBOX_REFRESH_TOKEN")
 ACCESS_TOKEN = os.getenv("DROPBOX_ACCESS_TOKEN")  # fallback
 
-if REFRESH_TOKEN and APP_KEY and APP_SECRET:
-    dbx = dropbox.Dropbox(
-        oauth2_refresh_token=REFRESH_TOKEN,
-        app_key=APP_KEY,
-        app_secret=APP_SECRET,
-    )
-elif ACCESS_TOKEN:
-    # OJO: si es de corta duración, puede expirar (mejor configurar refresh)
-    dbx = dropbox.Dropbox(ACCESS_TOKEN)
-else:
+def _create_dropbox_client():
+    import dropbox
+
+    if REFRESH_TOKEN and APP_KEY and APP_SECRET:
+        return instrumentar_dropbox(dropbox.Dropbox(
+            oauth2_refresh_token=REFRESH_TOKEN,
+            app_key=APP_KEY,
+            app_secret=APP_SECRET,
+        ))
+    if ACCESS_TOKEN:
+        # OJO: si es de corta duración, puede expirar (mejor configurar refresh)
+        return instrumentar_dropbox(dropbox.Dropbox(ACCESS_TOKEN))
     raise ValueError(
         "Configura DROPBOX_REFRESH_TOKEN + DROPBOX_APP_KEY + DROPBOX_APP_SECRET "
         "o bien un DROPBOX_ACCESS_TOKEN válido en tu .env"
     )
 
+dbx = None
+_dbx_pid = None
+_dbx_lock = threading.Lock()
+
+def obtener_cliente():
+    """
+    Cliente Dropbox del proceso actual, creado en el primer uso y recreado si
+    el proceso se forkeó (no se comparte la sesión HTTP del padre). Si faltan
+    credenciales el ValueError sale acá, no al importar el módulo.
+    """
+    global dbx, _dbx_pid
+    pid = os.getpid()
+    if _dbx_pid != pid:
+        with _dbx_lock:
+            if _dbx_pid != pid:
+                dbx = _create_dropbox_client()
+                _dbx_pid = pid
+    return dbx
+
+def usar_cliente(cliente):
+    """Fija el cliente del proceso actual (p.ej. un Dropbox falso en benchmarks)."""
+    global dbx, _dbx_pid
+    with _dbx_lock:
+        dbx = cliente
+        _dbx_pid = os.getpid()
+
+def reiniciar_cliente():
+    """
+    Descarta el cliente Dropbox; el próximo obtener_cliente() crea uno nuevo.
+    Se llama en cada worker después del fork (ver gunicorn.conf.py).
+    """
+    global dbx, _dbx_pid
+    with _dbx_lock:
+        dbx = None
+        _dbx_pid = None
+
 # =========================
 # Helpers internos
 # =========================
@@ -51,25 +102,64 @@ def _parent_dir(p: str) -> str:
     p = _norm(p)
     return posixpath.dirname(p) or "/"
 
+# Cache de carpetas que sabemos que existen: {path_lower: expira_en (monotonic)}
+FOLDER_CACHE_TTL = float(os.getenv("DROPBOX_FOLDER_CACHE_TTL", "600"))
+_carpetas_existentes = {}
+_carpetas_lock = threading.Lock()
+
+def _ancestros(p: str):
+    """'/a/b/c' -> ['/a/b/c', '/a/b', '/a'] (sin la raíz)."""
+    p = _norm(p)
+    res = []
+    while p != "/":
+        res.append(p.lower())
+        p = _parent_dir(p)
+    return res
+
+def _carpeta_en_cache(p: str) -> bool:
+    with _carpetas_lock:
+        expira = _carpetas_existentes.get(_norm(p).lower())
+        if expira is None:
+            return False
+        if expira < time.monotonic():
+            del _carpetas_existentes[_norm(p).lower()]
+            return False
+        return True
+
+def _marcar_carpeta(p: str):
+    # Si existe la carpeta, existen todos sus ancestros.
+    expira = time.monotonic() + FOLDER_CACHE_TTL
+    with _carpetas_lock:
+        for ancestro in _ancestros(p):
+            _carpetas_existentes[ancestro] = expira
+
+def _invalidar_carpeta(p: str):
+    """Olvida `p` y sus ancestros (no sabemos cuál de ellos dejó de existir)."""
+    with _carpetas_lock:
+        for ancestro in _ancestros(p):
+            _carpetas_existentes.pop(ancestro, None)
+
 def _ensure_folder(folder_path: str):
-    """Crea recursivamente las carpetas necesarias (si no existen). Idempotente."""
+    """
+    Asegura que exista la carpeta (si no existe, la crea). Idempotente.
+    Si está en cache no hace ninguna llamada; si no, crea directamente la
+    carpeta más profunda (Dropbox crea los padres que falten) y trata el
+    conflicto "ya existe una carpeta" como éxito.
+    """
+    from dropbox.exceptions import ApiError
+
     folder_path = _norm(folder_path)
-    if folder_path == "/":
+    if folder_path == "/" or _carpeta_en_cache(folder_path):
         return
-    parts = folder_path.strip("/").split("/")
-    cur = ""
-    for part in parts:
-        cur = _norm(cur + "/" + part)
-        try:
-            dbx.files_get_metadata(cur)
-        except ApiError:
-            try:
-                dbx.files_create_folder_v2(cur)
-            except ApiError as e2:
-                # si ya existe por condición de carrera, ignorar
-                err = getattr(e2, "error", None)
-                if not (err and err.is_path() and err.get_path().is_conflict()):
-                    raise
+    try:
+        obtener_cliente().files_create_folder_v2(folder_path)
+    except ApiError as e:
+        err = getattr(e, "error", None)
+        conflicto = err and err.is_path() and err.get_path().is_conflict()
+        if not (conflicto and err.get_path().get_conflict().is_folder()):
+            _invalidar_carpeta(folder_path)
+            raise
+    _marcar_carpeta(folder_path)
 
 # =========================
 # API que usás en Flask
@@ -79,9 +169,12 @@ def listar_archivos(folder_path: str = ""):
     Lista archivos de una carpeta de Dropbox (no recursivo).
     Retorna lista de dicts: { name, path, type, size?, server_modified? }
     """
+    from dropbox.exceptions import ApiError
+    from dropbox.files import FileMetadata
+
     try:
         folder_path = _norm(folder_path or "/")
-        result = dbx.files_list_folder(folder_path)
+        result = obtener_cliente().files_list_folder(folder_path)
 
         items = []
         def _to_item(e):
@@ -98,7 +191,7 @@ def listar_archivos(folder_path: str = ""):
         items.extend([_to_item(e) for e in result.entries])
 
         while result.has_more:
-            result = dbx.files_list_folder_continue(result.cursor)
+            result = obtener_cliente().files_list_folder_continue(result.cursor)
             items.extend([_to_item(e) for e in result.entries])
 
         return items
@@ -107,11 +200,186 @@ def listar_archivos(folder_path: str = ""):
     except Exception as e:
         return {"error": f"Error en listar_archivos: {str(e)}"}
 
-def subir_archivo(file_storage, path: str):
+# =========================
+# Upload por sesión concurrente (reanudable)
+# =========================
+# Las sesiones concurrentes exigen chunks múltiplos de 4MB (salvo el último).
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+UPLOAD_WORKERS = int(os.getenv("DROPBOX_UPLOAD_WORKERS", "4"))
+UPLOAD_STATE_DIR = os.getenv("DROPBOX_UPLOAD_STATE_DIR") or os.path.join(
+    tempfile.gettempdir(), "dropbox_upload_sessions"
+)
+
+class UploadSessionFallida(Exception):
+    """Error en una sesión de upload; el estado queda guardado para reanudar."""
+    def __init__(self, mensaje, session_id=None, offsets_completados=None):
+        super().__init__(mensaje)
+        self.session_id = session_id
+        self.offsets_completados = offsets_completados or []
+
+def _huella(stream, size: int, chunk_size: int) -> str:
+    """Hash del primer y del último chunk: distingue contenidos del mismo tamaño."""
+    h = hashlib.sha256()
+    for offset in sorted({0, ((size - 1) // chunk_size) * chunk_size}):
+        stream.seek(offset)
+        h.update(stream.read(min(chunk_size, size - offset)))
+    return h.hexdigest()
+
+def _estado_file(path: str, size: int, huella: str) -> str:
+    clave = hashlib.sha1(f"{path}:{size}:{huella}".encode("utf-8")).hexdigest()
+    return os.path.join(UPLOAD_STATE_DIR, f"{clave}.json")
+
+def _leer_estado(path: str, size: int, huella: str):
+    try:
+        with open(_estado_file(path, size, huella), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+def _guardar_estado(path: str, size: int, huella: str, session_id: str, chunks):
+    os.makedirs(UPLOAD_STATE_DIR, exist_ok=True)
+    destino = _estado_file(path, size, huella)
+    tmp = destino + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({
+            "path": path, "size": size, "huella": huella, "session_id": session_id,
+            "chunks": {str(offset): digest for offset, digest in sorted(chunks.items())},
+        }, fh)
+    os.replace(tmp, destino)
+
+def _borrar_estado(path: str, size: int, huella: str):
+    try:
+        os.remove(_estado_file(path, size, huella))
+    except OSError:
+        pass
+
+@contextmanager
+def _lock_upload(path: str, size: int, huella: str):
+    """
+    Lock de archivo (flock, lo libera el SO si el proceso muere) por upload:
+    un segundo upload del mismo archivo, en este u otro worker, no se engancha
+    a una sesión en curso. El .lock (vacío) no se borra al terminar: borrarlo
+    dejaría que dos procesos bloqueen inodos distintos del mismo nombre.
+    """
+    os.makedirs(UPLOAD_STATE_DIR, exist_ok=True)
+    with open(_estado_file(path, size, huella)[:-len(".json")] + ".lock", "a") as fh:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            raise UploadSessionFallida(f"Ya hay un upload en curso de {path}")
+        yield
+
+def _sesion_no_encontrada(e: "ApiError") -> bool:
+    err = getattr(e, "error", None)
+    if err is None:
+        return False
+    if hasattr(err, "is_lookup_failed") and err.is_lookup_failed():
+        err = err.get_lookup_failed()
+    return hasattr(err, "is_not_found") and err.is_not_found()
+
+def _subir_por_sesion_concurrente(stream, path: str, size: int,
+                                  chunk_size: int = UPLOAD_CHUNK_SIZE, workers: int = UPLOAD_WORKERS):
+    """
+    Sube `stream` con una sesión concurrente: los chunks se envían en paralelo
+    con un pool de `workers` hilos y como máximo 2*workers buffers en memoria.
+    Cada chunk confirmado se registra (session_id + offset + sha256) en
+    UPLOAD_STATE_DIR; si el upload falla, una nueva llamada con el mismo path,
+    tamaño y contenido reanuda la sesión y solo envía los offsets que faltan.
+    """
+    huella = _huella(stream, size, chunk_size)
+    with _lock_upload(path, size, huella):
+        _subir_sesion(stream, path, size, huella, chunk_size, workers)
+
+def _subir_sesion(stream, path: str, size: int, huella: str, chunk_size: int, workers: int):
+    from dropbox.exceptions import ApiError
+    from dropbox.files import CommitInfo, UploadSessionCursor, UploadSessionType, WriteMode
+
+    def _leer_chunk(offset):
+        stream.seek(offset)
+        return stream.read(min(chunk_size, size - offset))
+
+    estado = _leer_estado(path, size, huella)
+    if estado:
+        completados = {int(offset): digest for offset, digest in estado.get("chunks", {}).items()}
+        # Antes de saltear un offset se verifica que el chunk local sea el mismo
+        # que se subió; si no, la sesión vieja no sirve.
+        if any(hashlib.sha256(_leer_chunk(offset)).hexdigest() != digest
+               for offset, digest in completados.items()):
+            print(f"[DROPBOX] estado de upload de {path} no coincide con el contenido; sesión nueva")
+            _borrar_estado(path, size, huella)
+            estado = None
+    if estado:
+        session_id = estado["session_id"]
+    else:
+        session_id = obtener_cliente().files_upload_session_start(b"", session_type=UploadSessionType.concurrent).session_id
+        completados = {}
+        _guardar_estado(path, size, huella, session_id, completados)
+
+    offsets = list(range(0, size, chunk_size))
+    ultimo = offsets[-1]
+    lock = threading.Lock()
+    buffers = threading.BoundedSemaphore(workers * 2)
+    fallo = threading.Event()
+
+    def _append(data, offset, close=False):
+        try:
+            cursor = UploadSessionCursor(session_id=session_id, offset=offset)
+            obtener_cliente().files_upload_session_append_v2(data, cursor, close=close)
+            with lock:
+                completados[offset] = hashlib.sha256(data).hexdigest()
+                _guardar_estado(path, size, huella, session_id, completados)
+        except Exception:
+            fallo.set()
+            raise
+        finally:
+            buffers.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for offset in offsets[:-1]:
+                if offset in completados:
+                    continue
+                buffers.acquire()
+                if fallo.is_set():
+                    buffers.release()
+                    break
+                futures.append(pool.submit(_append, _leer_chunk(offset), offset))
+            for future in futures:
+                future.result()
+
+        # El último chunk cierra la sesión: se envía cuando el resto ya está confirmado.
+        if ultimo not in completados:
+            buffers.acquire()
+            _append(_leer_chunk(ultimo), ultimo, close=True)
+
+        cursor = UploadSessionCursor(session_id=session_id, offset=size)
+        commit = CommitInfo(path=path, mode=WriteMode("overwrite"))
+        obtener_cliente().files_upload_session_finish(b"", cursor, commit)
+    except ApiError as e:
+        if estado and _sesion_no_encontrada(e):
+            # La sesión guardada expiró (duran 7 días): empezar de cero.
+            _borrar_estado(path, size, huella)
+            return _subir_sesion(stream, path, size, huella, chunk_size, workers)
+        raise UploadSessionFallida(str(e), session_id, sorted(completados)) from e
+    except Exception as e:
+        raise UploadSessionFallida(str(e), session_id, sorted(completados)) from e
+
+    _borrar_estado(path, size, huella)
+
+def subir_archivo(file_storage, path: str, concurrente: bool = True):
     """
     Sube el contenido de file_storage (werkzeug) a 'path' (ruta completa en Dropbox).
-    Crea las carpetas destino si no existen. Usa upload por sesión si >150MB.
+    Crea las carpetas destino si no existen. Con `concurrente` (default) todo lo
+    que supere un chunk va por sesión concurrente reanudable; si no, usa el
+    upload secuencial por sesión para >150MB.
     """
+    from dropbox.exceptions import ApiError
+    from dropbox.files import CommitInfo, UploadSessionCursor, WriteMode
+
     try:
         path = _norm(path)
         _ensure_folder(_parent_dir(path))
@@ -121,25 +389,35 @@ def subir_archivo(file_storage, path: str):
         size = stream.tell()
         stream.seek(0)
 
-        CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
-        if size <= 150 * 1024 * 1024:
-            dbx.files_upload(stream.read(), path, mode=WriteMode("overwrite"))
+        CHUNK_SIZE = UPLOAD_CHUNK_SIZE
+        if concurrente and size > CHUNK_SIZE:
+            _subir_por_sesion_concurrente(stream, path, size)
+        elif size <= (CHUNK_SIZE if concurrente else 150 * 1024 * 1024):
+            obtener_cliente().files_upload(stream.read(), path, mode=WriteMode("overwrite"))
         else:
-            upload_session_start_result = dbx.files_upload_session_start(stream.read(CHUNK_SIZE))
-            cursor = dropbox.files.UploadSessionCursor(
+            upload_session_start_result = obtener_cliente().files_upload_session_start(stream.read(CHUNK_SIZE))
+            cursor = UploadSessionCursor(
                 session_id=upload_session_start_result.session_id,
                 offset=stream.tell()
             )
-            commit = dropbox.files.CommitInfo(path=path, mode=WriteMode("overwrite"))
+            commit = CommitInfo(path=path, mode=WriteMode("overwrite"))
             while stream.tell() < size:
                 if (size - stream.tell()) <= CHUNK_SIZE:
-                    dbx.files_upload_session_finish(stream.read(CHUNK_SIZE), cursor, commit)
+                    obtener_cliente().files_upload_session_finish(stream.read(CHUNK_SIZE), cursor, commit)
                 else:
-                    dbx.files_upload_session_append_v2(stream.read(CHUNK_SIZE), cursor)
+                    obtener_cliente().files_upload_session_append_v2(stream.read(CHUNK_SIZE), cursor)
                     cursor.offset = stream.tell()
 
         return {"msg": f"Archivo {path} subido con éxito"}
+    except UploadSessionFallida as e:
+        _invalidar_carpeta(_parent_dir(path))
+        return {
+            "error": f"Error en subir_archivo (sesión reanudable): {e}",
+            "session_id": e.session_id,
+            "offsets_completados": e.offsets_completados,
+        }
     except ApiError as e:
+        _invalidar_carpeta(_parent_dir(path))
         return {"error": f"Dropbox API error en subir_archivo: {e}"}
     except Exception as e:
         return {"error": f"Error en subir_archivo: {str(e)}"}
@@ -148,26 +426,141 @@ def descargar_archivo(path: str):
     """
     Devuelve (bytes, filename) o (None, 'mensaje de error')
     """
+    from dropbox.exceptions import ApiError
+
     try:
         path = _norm(path)
-        metadata, res = dbx.files_download(path)
+        metadata, res = obtener_cliente().files_download(path)
         return res.content, metadata.name
     except ApiError as e:
         return None, f"Dropbox API error en descargar_archivo: {e}"
     except Exception as e:
         return None, f"Error en descargar_archivo: {str(e)}"
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+def descargar_archivo_stream(path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    """
+    Variante en streaming de descargar_archivo: no lee el archivo a memoria.
+    Devuelve (iterador_de_chunks, metadata) o (None, 'mensaje de error').
+    El iterador cierra la respuesta HTTP de Dropbox al terminar o al cortarse.
+    """
+    from dropbox.exceptions import ApiError
+
+    try:
+        path = _norm(path)
+        metadata, res = obtener_cliente().files_download(path)
+    except ApiError as e:
+        return None, f"Dropbox API error en descargar_archivo: {e}"
+    except Exception as e:
+        return None, f"Error en descargar_archivo: {str(e)}"
+
+    def _chunks():
+        try:
+            for chunk in res.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            res.close()
+
+    return _chunks(), metadata
+
+# =========================
+# Moves pendientes de /consume
+# =========================
+# Si el archivo ya se entregó pero el move falló, el par path/dest se guarda
+# acá (compartido entre workers) para reintentarlo y para que /consume no
+# vuelva a servir un archivo ya consumido.
+MOVES_PENDIENTES_FILE = os.getenv("DROPBOX_MOVES_PENDIENTES_FILE") or os.path.join(
+    UPLOAD_STATE_DIR, "moves_pendientes.json"
+)
+
+@contextmanager
+def _moves_pendientes():
+    """Lock exclusivo (bloqueante) sobre el archivo; lo que quede en el dict se guarda."""
+    os.makedirs(os.path.dirname(MOVES_PENDIENTES_FILE), exist_ok=True)
+    with open(MOVES_PENDIENTES_FILE + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            with open(MOVES_PENDIENTES_FILE, "r", encoding="utf-8") as fh:
+                pendientes = json.load(fh)
+        except (OSError, ValueError):
+            pendientes = {}
+        yield pendientes
+        tmp = MOVES_PENDIENTES_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(pendientes, fh)
+        os.replace(tmp, MOVES_PENDIENTES_FILE)
+
+def registrar_move_pendiente(from_path: str, to_path: str, rev: str, error: str):
+    """`rev` es la del archivo entregado: si en el origen aparece otro, el registro no aplica."""
+    with _moves_pendientes() as pendientes:
+        pendientes[_norm(from_path)] = {"dest": to_path, "rev": rev, "error": error, "fecha": time.time()}
+
+def move_pendiente(from_path: str):
+    """El registro pendiente de `from_path` (dict con dest/rev/error/fecha) o None."""
+    with _moves_pendientes() as pendientes:
+        return pendientes.get(_norm(from_path))
+
+def listar_moves_pendientes():
+    with _moves_pendientes() as pendientes:
+        return dict(pendientes)
+
+def _no_encontrado(e: "ApiError") -> bool:
+    err = getattr(e, "error", None)
+    if err is not None and hasattr(err, "is_path") and err.is_path():
+        err = err.get_path()
+    return err is not None and hasattr(err, "is_not_found") and err.is_not_found()
+
+def _resolver_move_pendiente(path: str, registro: dict):
+    """Reintenta un move pendiente solo si en el origen sigue el mismo archivo (misma rev)."""
+    from dropbox.exceptions import ApiError
+
+    try:
+        actual = obtener_cliente().files_get_metadata(path)
+    except ApiError as e:
+        if _no_encontrado(e):
+            return {"msg": f"{path} ya no está en el origen; se descarta el move pendiente"}
+        return {"error": f"Dropbox API error en get_metadata: {e}"}
+    if getattr(actual, "rev", None) != registro.get("rev"):
+        return {"msg": f"{path} fue reemplazado; se descarta el move pendiente"}
+    return mover_archivo(path, registro["dest"])
+
+def reintentar_moves_pendientes(from_path: str = None):
+    """
+    Reintenta los moves pendientes (todos, o solo el de `from_path`).
+    Devuelve {path: {"msg"|"error": ...}}; los resueltos se borran del registro.
+    """
+    with _moves_pendientes() as pendientes:
+        paths = [_norm(from_path)] if from_path else list(pendientes)
+        resultados = {}
+        for path in paths:
+            if path not in pendientes:
+                continue
+            resultados[path] = _resolver_move_pendiente(path, pendientes[path])
+            if "error" in resultados[path]:
+                pendientes[path]["error"] = resultados[path]["error"]
+            else:
+                del pendientes[path]
+        return resultados
+
 def mover_archivo(from_path: str, to_path: str):
     """
     Mueve un archivo. Crea la carpeta destino si no existe.
     """
+    from dropbox.exceptions import ApiError
+
     try:
         from_path = _norm(from_path)
         to_path = _norm(to_path)
         _ensure_folder(_parent_dir(to_path))
-        dbx.files_move_v2(from_path, to_path, autorename=True)
+        obtener_cliente().files_move_v2(from_path, to_path, autorename=True)
         return {"msg": f"Archivo movido de {from_path} a {to_path}"}
     except ApiError as e:
+        _invalidar_carpeta(_parent_dir(to_path))
         return {"error": f"Dropbox API error en mover_archivo: {e}"}
     except Exception as e:
         return {"error": f"Error en mover_archivo: {str(e)}"}
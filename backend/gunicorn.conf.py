@@ -0,0 +1,68 @@
+# gunicorn.conf.py
+# Servidor de produccion:  gunicorn -c gunicorn.conf.py app:app
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '3001')}"
+
+# Las rutas hacen llamadas bloqueantes a S3/Dropbox: procesos x hilos (gthread)
+# para que una descarga lenta no frene al resto de las requests.
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 9)))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Se importa la app una vez en el master y despues se forkean los workers.
+preload_app = True
+
+# Con gthread el timeout es el latido del worker, no la duracion de la request;
+# graceful_timeout es lo que se espera a que terminen uploads/descargas en curso
+# al reiniciar, y tiene que alcanzar para un zip de varios GB.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '900'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Reciclar workers de a poco evita que crezca la memoria indefinidamente.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+# Cada worker vuelca sus metricas aca y /metrics suma las de todos (ver
+# instrumentacion). Tiene que ser propio de este servidor.
+METRICAS_DIR = os.getenv('METRICAS_DIR') or os.path.join(
+    tempfile.gettempdir(), f"app_metricas_{os.getenv('PORT', '3001')}"
+)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def on_starting(server):
+    import instrumentacion
+
+    instrumentacion.limpiar_directorio(METRICAS_DIR)
+
+
+def child_exit(server, worker):
+    import instrumentacion
+
+    instrumentacion.consolidar_worker(METRICAS_DIR, worker.pid)
+
+
+def post_fork(server, worker):
+    # Los clientes creados en el master comparten sockets con el resto de los
+    # workers: cada worker crea los suyos.
+    import s3_service
+    import dropbox_service
+
+    s3_service.reiniciar_cliente()
+    dropbox_service.reiniciar_cliente()
+
+    # Tampoco se comparten las conexiones del pool de SQLAlchemy.
+    from app import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    import instrumentacion
+    instrumentacion.iniciar_worker(METRICAS_DIR)
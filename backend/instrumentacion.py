@@ -0,0 +1,427 @@
+# instrumentacion.py
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from models import db
+
+
+class ContadorQueries:
+    """Resultado de contar_queries: total de sentencias SQL y su texto."""
+
+    def __init__(self):
+        self.total = 0
+        self.sentencias = []
+
+    def __repr__(self):
+        return f"<ContadorQueries total={self.total}>"
+
+
+@contextmanager
+def contar_queries(engine=None):
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque (requiere app context
+    si no se pasa `engine`). Cuenta las de todos los hilos que usen ese engine,
+    así que está pensado para tests y benchmarks, p.ej.:
+
+        with app.app_context(), contar_queries() as queries:
+            client.get('/api/productor/archivos?cod_productor=P1')
+        assert queries.total == 3
+    """
+    engine = engine or db.engine
+    contador = ContadorQueries()
+
+    def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+        contador.total += 1
+        contador.sentencias.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _antes_de_ejecutar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', _antes_de_ejecutar)
+
+
+# =========================
+# Tiempos por request y metricas Prometheus
+# =========================
+# Cada llamada medida (S3, Dropbox, SQL) se registra en un histograma del
+# proceso y, si ocurre en el hilo de una request, en el resumen que termina en
+# el header Server-Timing.
+#
+# Con varios workers de gunicorn (ver gunicorn.conf.py) cada worker vuelca sus
+# series a un archivo propio en METRICAS_DIR cada METRICAS_INTERVALO segundos,
+# y /metrics suma los archivos de todos: cualquier worker que atienda el scrape
+# devuelve el total del servidor. Lo de los workers reciclados se suma a un
+# archivo consolidado para que los contadores nunca bajen; el directorio se
+# limpia cuando arranca el master. Un worker que muere de golpe pierde a lo
+# sumo el ultimo intervalo.
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICAS_INTERVALO = float(os.getenv('METRICAS_INTERVALO', '1'))
+
+
+class Histograma:
+    """Histograma acumulativo con labels, en el formato de texto de Prometheus."""
+
+    def __init__(self, nombre, ayuda, labels, buckets=BUCKETS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *labels):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def series(self):
+        with self._lock:
+            return {labels: [list(conteos), suma, total] for labels, (conteos, suma, total) in self._series.items()}
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+
+    @staticmethod
+    def acumular(series, labels, valor):
+        serie = series.get(labels)
+        if serie is None:
+            series[labels] = [list(valor[0]), valor[1], valor[2]]
+        else:
+            serie[0] = [a + b for a, b in zip(serie[0], valor[0])]
+            serie[1] += valor[1]
+            serie[2] += valor[2]
+
+    def exportar(self, series=None):
+        series = self.series() if series is None else series
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for labels, (conteos, suma, total) in sorted(series.items()):
+            base = ','.join(f'{k}="{_escapar_label(v)}"' for k, v in zip(self.labels, labels))
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                lineas.append(f'{self.nombre}_bucket{{{base},le="{limite}"}} {acumulado}')
+            lineas.append(f'{self.nombre}_bucket{{{base},le="+Inf"}} {total}')
+            lineas.append(f'{self.nombre}_sum{{{base}}} {suma:.6f}')
+            lineas.append(f'{self.nombre}_count{{{base}}} {total}')
+        return '\n'.join(lineas)
+
+
+class Contador:
+    """Contador acumulativo con labels, en el formato de texto de Prometheus."""
+
+    def __init__(self, nombre, ayuda, labels):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *labels, cantidad=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + cantidad
+
+    def series(self):
+        with self._lock:
+            return dict(self._series)
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+
+    @staticmethod
+    def acumular(series, labels, valor):
+        series[labels] = series.get(labels, 0) + valor
+
+    def valores(self):
+        """Valores del servidor (todos los workers), no solo de este proceso."""
+        return series_combinadas()[self.nombre]
+
+    def exportar(self, series=None):
+        series = self.series() if series is None else series
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for labels, valor in sorted(series.items()):
+            base = ','.join(f'{k}="{_escapar_label(v)}"' for k, v in zip(self.labels, labels))
+            lineas.append(f'{self.nombre}{{{base}}} {valor}')
+        return '\n'.join(lineas)
+
+
+def _escapar_label(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+HISTOGRAMA_LLAMADAS = Histograma(
+    'app_llamada_segundos', 'Duracion de llamadas a S3, Dropbox y la base', ('servicio', 'operacion'))
+HISTOGRAMA_REQUESTS = Histograma(
+    'app_request_segundos', 'Duracion de las requests HTTP por endpoint', ('endpoint', 'metodo', 'status'))
+
+CONTADOR_ERRORES = Contador(
+    'app_errores_total', 'Errores que no llegan al cliente (p.ej. despues de enviar la respuesta)',
+    ('servicio', 'operacion'))
+
+# Lo que exporta /metrics; otros modulos agregan aqui sus metricas (ver coalescencia)
+METRICAS = [HISTOGRAMA_LLAMADAS, HISTOGRAMA_REQUESTS, CONTADOR_ERRORES]
+
+_contexto = threading.local()
+
+
+def registrar(servicio, operacion, segundos):
+    """Registra una llamada ya medida en el histograma y en el resumen de la request actual."""
+    HISTOGRAMA_LLAMADAS.observar(segundos, servicio, operacion)
+    resumen = getattr(_contexto, 'resumen', None)
+    if resumen is not None:
+        acumulado = resumen.setdefault(servicio, [0.0, 0])
+        acumulado[0] += segundos
+        acumulado[1] += 1
+
+
+def registrar_error(servicio, operacion, mensaje):
+    """Para fallas que el cliente no puede ver: se loguean y cuentan en /metrics."""
+    print(f"[ERROR] servicio={servicio} operacion={operacion} {mensaje}")
+    CONTADOR_ERRORES.incrementar(servicio, operacion)
+
+
+@contextmanager
+def medir(servicio, operacion):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(servicio, operacion, time.perf_counter() - inicio)
+
+
+# --- S3: eventos de botocore (cubre tambien las transferencias de s3transfer) ---
+
+def _s3_antes(context, **kwargs):
+    context['_instrumentacion_inicio'] = time.perf_counter()
+
+
+def _s3_despues(model, context, **kwargs):
+    inicio = context.pop('_instrumentacion_inicio', None)
+    if inicio is not None:
+        registrar('s3', model.name, time.perf_counter() - inicio)
+
+
+def instrumentar_s3(cliente):
+    eventos = cliente.meta.events
+    eventos.register('before-call.s3', _s3_antes)
+    eventos.register('after-call.s3', _s3_despues)
+    eventos.register('after-call-error.s3', _s3_despues)
+    return cliente
+
+
+# --- Dropbox: todas las rutas del SDK pasan por Dropbox.request ---
+
+def instrumentar_dropbox(cliente):
+    request_original = cliente.request
+
+    def request(route, *args, **kwargs):
+        with medir('dropbox', route.name):
+            return request_original(route, *args, **kwargs)
+
+    cliente.request = request
+    return cliente
+
+
+# --- SQLAlchemy: todos los engines ---
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_instrumentacion_inicio', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_instrumentacion_inicio')
+    if inicios:
+        registrar('db', statement.lstrip().split(None, 1)[0].upper(), time.perf_counter() - inicios.pop())
+
+
+@event.listens_for(Engine, 'handle_error')
+def _sql_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('_instrumentacion_inicio'):
+        conn.info['_instrumentacion_inicio'].pop()
+
+
+# --- Flask: Server-Timing y /metrics ---
+
+def _iniciar_request():
+    _contexto.resumen = {}
+    _contexto.inicio = time.perf_counter()
+
+
+def _cerrar_request(response):
+    resumen = getattr(_contexto, 'resumen', None)
+    if resumen is None:
+        return response
+    total = time.perf_counter() - _contexto.inicio
+    _contexto.resumen = None
+
+    partes = [
+        f'{servicio};dur={segundos * 1000:.1f};desc="{cantidad} llamadas"'
+        for servicio, (segundos, cantidad) in sorted(resumen.items())
+    ]
+    partes.append(f'total;dur={total * 1000:.1f}')
+    response.headers['Server-Timing'] = ', '.join(partes)
+    HISTOGRAMA_REQUESTS.observar(
+        total, request.url_rule.rule if request.url_rule else 'sin_ruta', request.method, response.status_code)
+    return response
+
+
+# --- Agregado entre workers ---
+
+_archivo_worker = None
+_volcado_lock = threading.Lock()
+
+
+def limpiar_directorio(directorio):
+    """Para el master de gunicorn al arrancar: descarta lo de una corrida anterior."""
+    os.makedirs(directorio, exist_ok=True)
+    for archivo in glob.glob(os.path.join(directorio, '*.json')):
+        os.remove(archivo)
+
+
+def iniciar_worker(directorio):
+    """
+    Para gunicorn post_fork: el worker empieza sus series de cero (no hereda
+    las del master) y las vuelca periodicamente a su propio archivo. El
+    nombre lleva un id aleatorio ademas del pid, que el SO puede reutilizar.
+    """
+    global _archivo_worker
+    for metrica in METRICAS:
+        metrica.reiniciar()
+    os.makedirs(directorio, exist_ok=True)
+    _archivo_worker = os.path.join(directorio, f"worker_{os.getpid()}_{uuid.uuid4().hex[:8]}.json")
+    volcar()
+    threading.Thread(target=_volcar_periodicamente, name='metricas', daemon=True).start()
+    atexit.register(volcar)
+
+
+def volcar():
+    if _archivo_worker is None:
+        return
+    datos = {
+        metrica.nombre: [[list(labels), valor] for labels, valor in metrica.series().items()]
+        for metrica in METRICAS
+    }
+    with _volcado_lock:
+        tmp = _archivo_worker + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(datos, fh)
+        os.replace(tmp, _archivo_worker)
+
+
+def _volcar_periodicamente():
+    while True:
+        time.sleep(METRICAS_INTERVALO)
+        try:
+            volcar()
+        except OSError as e:
+            print(f"[METRICAS] no se pudo volcar {_archivo_worker}: {e}")
+
+
+# Los archivos de workers que terminaron (max_requests) se suman a este, para
+# que el directorio no crezca. `incluidos` evita contarlos dos veces si un
+# scrape leyo el archivo del worker justo antes de consolidarlo.
+CONSOLIDADO = 'consolidado.json'
+CONSOLIDADO_RETENCION = 600
+
+
+def _leer_json(archivo):
+    try:
+        with open(archivo, 'r', encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def consolidar_worker(directorio, pid):
+    """Para gunicorn child_exit (en el master): suma los archivos del worker `pid` al consolidado."""
+    archivos = glob.glob(os.path.join(directorio, f'worker_{pid}_*.json'))
+    if not archivos:
+        return
+    destino = os.path.join(directorio, CONSOLIDADO)
+    consolidado = _leer_json(destino) or {'metricas': {}, 'incluidos': {}}
+    series = {
+        metrica.nombre: {tuple(labels): valor for labels, valor in consolidado['metricas'].get(metrica.nombre, [])}
+        for metrica in METRICAS
+    }
+    ahora = time.time()
+    for archivo in archivos:
+        datos = _leer_json(archivo) or {}
+        for metrica in METRICAS:
+            for labels, valor in datos.get(metrica.nombre, []):
+                metrica.acumular(series[metrica.nombre], tuple(labels), valor)
+        consolidado['incluidos'][os.path.basename(archivo)] = ahora
+    consolidado['incluidos'] = {
+        nombre: cuando for nombre, cuando in consolidado['incluidos'].items()
+        if ahora - cuando < CONSOLIDADO_RETENCION
+    }
+    consolidado['metricas'] = {
+        nombre: [[list(labels), valor] for labels, valor in valores.items()] for nombre, valores in series.items()
+    }
+    tmp = destino + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(consolidado, fh)
+    os.replace(tmp, destino)
+    for archivo in archivos:
+        os.remove(archivo)
+
+
+def series_combinadas():
+    """{nombre de metrica: series} de todo el servidor, o de este proceso si no hay workers."""
+    if _archivo_worker is None:
+        return {metrica.nombre: metrica.series() for metrica in METRICAS}
+
+    volcar()
+    directorio = os.path.dirname(_archivo_worker)
+    # Primero los workers y despues el consolidado: un archivo que desaparece
+    # entre medio ya esta sumado en el consolidado que se lee despues.
+    por_worker = {}
+    for archivo in glob.glob(os.path.join(directorio, 'worker_*.json')):
+        datos = _leer_json(archivo)
+        if datos is not None:
+            por_worker[os.path.basename(archivo)] = datos
+    consolidado = _leer_json(os.path.join(directorio, CONSOLIDADO)) or {'metricas': {}, 'incluidos': {}}
+
+    combinadas = {metrica.nombre: {} for metrica in METRICAS}
+    fuentes = [consolidado['metricas']] + [
+        datos for nombre, datos in por_worker.items() if nombre not in consolidado['incluidos']
+    ]
+    for datos in fuentes:
+        for metrica in METRICAS:
+            for labels, valor in datos.get(metrica.nombre, []):
+                metrica.acumular(combinadas[metrica.nombre], tuple(labels), valor)
+    return combinadas
+
+
+def metricas():
+    series = series_combinadas()
+    cuerpo = ''.join(metrica.exportar(series[metrica.nombre]) + '\n' for metrica in METRICAS)
+    return Response(cuerpo, mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Activa Server-Timing en todas las respuestas y expone /metrics."""
+    app.before_request(_iniciar_request)
+    app.after_request(_cerrar_request)
+    app.add_url_rule('/metrics', 'metricas', metricas)
@@ -0,0 +1,252 @@
+# kml_service.py
+import io
+import json
+import math
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Mismo radio que usa Leaflet (L.GeometryUtil.geodesicArea) en el frontend
+RADIO_TIERRA = 6378137.0
+
+# =========================
+# Helpers internos
+# =========================
+def _area_anillo(anillo):
+    """Área geodésica aproximada (m²) de un anillo [[lon, lat], ...]."""
+    if len(anillo) < 3:
+        return 0.0
+    total = 0.0
+    for i in range(len(anillo)):
+        lon1, lat1 = anillo[i][0], anillo[i][1]
+        lon2, lat2 = anillo[(i + 1) % len(anillo)][0], anillo[(i + 1) % len(anillo)][1]
+        total += math.radians(lon2 - lon1) * (2 + math.sin(math.radians(lat1)) + math.sin(math.radians(lat2)))
+    return abs(total * RADIO_TIERRA * RADIO_TIERRA / 2.0)
+
+def _centroide_anillo(anillo):
+    """Centroide plano (lon, lat) de un anillo y su área con signo en grados²."""
+    if not anillo:
+        return None, 0.0
+    # Se trabaja relativo al primer vértice para no perder precisión
+    ox, oy = anillo[0][0], anillo[0][1]
+    area2 = cx = cy = 0.0
+    for i in range(len(anillo)):
+        x1, y1 = anillo[i][0] - ox, anillo[i][1] - oy
+        x2, y2 = anillo[(i + 1) % len(anillo)][0] - ox, anillo[(i + 1) % len(anillo)][1] - oy
+        cruz = x1 * y2 - x2 * y1
+        area2 += cruz
+        cx += (x1 + x2) * cruz
+        cy += (y1 + y2) * cruz
+    if area2 == 0:
+        n = len(anillo)
+        return [sum(p[0] for p in anillo) / n, sum(p[1] for p in anillo) / n], 0.0
+    return [ox + cx / (3 * area2), oy + cy / (3 * area2)], area2 / 2.0
+
+def _poligonos(geometry):
+    """Lista de polígonos (lista de anillos) de una geometría GeoJSON."""
+    tipo = geometry.get('type')
+    if tipo == 'Polygon':
+        return [geometry['coordinates']]
+    if tipo == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    if tipo == 'GeometryCollection':
+        res = []
+        for g in geometry.get('geometries', []):
+            res.extend(_poligonos(g))
+        return res
+    return []
+
+def _puntos(geometry):
+    tipo = geometry.get('type')
+    coords = geometry.get('coordinates')
+    if tipo == 'Point':
+        yield coords
+    elif tipo in ('LineString', 'MultiPoint'):
+        yield from coords
+    elif tipo in ('Polygon', 'MultiLineString'):
+        for parte in coords:
+            yield from parte
+    elif tipo == 'MultiPolygon':
+        for poligono in coords:
+            for anillo in poligono:
+                yield from anillo
+    elif tipo == 'GeometryCollection':
+        for g in geometry.get('geometries', []):
+            yield from _puntos(g)
+
+# =========================
+# API
+# =========================
+def metricas_geometria(geometry):
+    """
+    Devuelve {area_ha, centroide, bbox} de una geometría GeoJSON.
+    El área descuenta los anillos interiores; el centroide es el ponderado por
+    área de los anillos exteriores (o el centro del bbox si no hay polígonos).
+    """
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for punto in _puntos(geometry):
+        min_x, max_x = min(min_x, punto[0]), max(max_x, punto[0])
+        min_y, max_y = min(min_y, punto[1]), max(max_y, punto[1])
+    if min_x == math.inf:
+        return {'area_ha': 0.0, 'centroide': None, 'bbox': None}
+    bbox = [min_x, min_y, max_x, max_y]
+
+    area_m2 = 0.0
+    peso = cx = cy = 0.0
+    for anillos in _poligonos(geometry):
+        if not anillos:
+            continue
+        area_m2 += _area_anillo(anillos[0]) - sum(_area_anillo(a) for a in anillos[1:])
+        centro, area_signo = _centroide_anillo(anillos[0])
+        if centro is None:
+            continue
+        area_abs = abs(area_signo)
+        peso += area_abs
+        cx += centro[0] * area_abs
+        cy += centro[1] * area_abs
+
+    if peso > 0:
+        centroide = [cx / peso, cy / peso]
+    else:
+        centroide = [(min_x + max_x) / 2.0, (min_y + max_y) / 2.0]
+
+    return {'area_ha': round(max(area_m2, 0.0) / 10000.0, 4), 'centroide': centroide, 'bbox': bbox}
+
+def enriquecer_geojson(feature_collection):
+    """Agrega area_ha y centroide a properties y 'bbox' a cada feature (in place)."""
+    for feature in feature_collection.get('features', []):
+        metricas = metricas_geometria(feature.get('geometry') or {})
+        propiedades = feature.setdefault('properties', {})
+        propiedades['area_ha'] = metricas['area_ha']
+        propiedades['centroide'] = metricas['centroide']
+        if metricas['bbox']:
+            feature['bbox'] = metricas['bbox']
+    return feature_collection
+
+def serializar_geojson(feature_collection):
+    """Devuelve (json_compacto, etag) listo para guardar junto al KML."""
+    texto = json.dumps(feature_collection, separators=(',', ':'), ensure_ascii=False)
+    return texto, hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+# =========================
+# Parser KML/KMZ en streaming
+# =========================
+_TIPOS_MULTI = {'Polygon': 'MultiPolygon', 'LineString': 'MultiLineString', 'Point': 'MultiPoint'}
+
+def _tag(elem):
+    # '{http://www.opengis.net/kml/2.2}Placemark' -> 'Placemark' (cualquier namespace)
+    return elem.tag.rsplit('}', 1)[-1]
+
+def _parsear_coordenadas(texto):
+    """
+    'lon,lat[,alt] lon,lat[,alt] ...' -> [(lon, lat), ...] convirtiendo todos
+    los números de una sola vez (las tuplas se serializan igual en JSON).
+    """
+    if not texto:
+        return []
+    numeros = texto.replace(',', ' ').split()
+    if not numeros:
+        return []
+    dim = texto.split(None, 1)[0].count(',') + 1
+    if dim >= 2 and len(numeros) % dim == 0 and texto.count(',') == (dim - 1) * (len(numeros) // dim):
+        valores = list(map(float, numeros))
+        return list(zip(valores[0::dim], valores[1::dim]))
+    # Tuplas con distinta dimensión: parseo tupla por tupla
+    coords = []
+    for tupla in texto.split():
+        partes = [p for p in tupla.split(',') if p]
+        if len(partes) >= 2:
+            coords.append((float(partes[0]), float(partes[1])))
+    return coords
+
+def _geometria_placemark(geometrias):
+    if not geometrias:
+        return None
+    if len(geometrias) == 1:
+        return geometrias[0]
+    tipos = {g['type'] for g in geometrias}
+    if len(tipos) == 1 and next(iter(tipos)) in _TIPOS_MULTI:
+        return {
+            'type': _TIPOS_MULTI[next(iter(tipos))],
+            'coordinates': [g['coordinates'] for g in geometrias],
+        }
+    return {'type': 'GeometryCollection', 'geometries': geometrias}
+
+def _abrir_fuente(fuente):
+    """Acepta bytes o file-like, KML o KMZ (zip con un .kml adentro)."""
+    if isinstance(fuente, (bytes, bytearray)):
+        fuente = io.BytesIO(fuente)
+    inicio = fuente.read(4)
+    fuente.seek(0)
+    if inicio != b'PK\x03\x04':
+        return fuente
+    kmz = zipfile.ZipFile(fuente)
+    nombres = [n for n in kmz.namelist() if n.lower().endswith('.kml')]
+    if not nombres:
+        raise ET.ParseError('El KMZ no contiene ningun archivo .kml')
+    # Por convencion el documento principal es doc.kml; si no, el primero.
+    principal = 'doc.kml' if 'doc.kml' in nombres else nombres[0]
+    return kmz.open(principal)
+
+def iterar_features_kml(fuente):
+    """
+    Genera features GeoJSON de un KML/KMZ usando iterparse: cada Placemark se
+    descarta del arbol apenas se emite, asi la memoria no crece con el archivo.
+    Soporta Polygon (con anillos interiores), LineString, Point y MultiGeometry.
+    """
+    pila = []
+    placemark = None
+    for evento, elem in ET.iterparse(_abrir_fuente(fuente), events=('start', 'end')):
+        if evento == 'start':
+            pila.append(elem)
+            tag = _tag(elem)
+            if tag == 'Placemark':
+                placemark = {'name': None, 'description': None, 'geometrias': []}
+            elif placemark is not None and tag == 'Polygon':
+                placemark['poligono'] = []
+            continue
+
+        pila.pop()
+        if placemark is None:
+            continue
+        tag = _tag(elem)
+        padre = _tag(pila[-1]) if pila else None
+
+        if tag in ('name', 'description') and padre == 'Placemark':
+            placemark[tag] = (elem.text or '').strip() or None
+        elif tag == 'coordinates':
+            coords = _parsear_coordenadas(elem.text)
+            contenedores = {_tag(e) for e in pila[-3:]}
+            if 'outerBoundaryIs' in contenedores or 'innerBoundaryIs' in contenedores:
+                anillos = placemark.setdefault('poligono', [])
+                if 'outerBoundaryIs' in contenedores:
+                    anillos.insert(0, coords)
+                else:
+                    anillos.append(coords)
+            elif padre == 'LineString':
+                placemark['geometrias'].append({'type': 'LineString', 'coordinates': coords})
+            elif padre == 'Point' and coords:
+                placemark['geometrias'].append({'type': 'Point', 'coordinates': coords[0]})
+        elif tag == 'Polygon':
+            anillos = placemark.pop('poligono', None)
+            if anillos:
+                placemark['geometrias'].append({'type': 'Polygon', 'coordinates': anillos})
+        elif tag == 'Placemark':
+            geometria = _geometria_placemark(placemark['geometrias'])
+            if geometria is not None:
+                propiedades = {'name': placemark['name'] or 'Unnamed'}
+                if placemark['description']:
+                    propiedades['description'] = placemark['description']
+                yield {'type': 'Feature', 'geometry': geometria, 'properties': propiedades}
+            placemark = None
+            elem.clear()
+            if pila:
+                pila[-1].remove(elem)
+
+def kml_a_geojson(fuente):
+    """FeatureCollection GeoJSON de un KML/KMZ (bytes o file-like)."""
+    return {
+        'type': 'FeatureCollection',
+        'features': list(iterar_features_kml(fuente)),
+    }
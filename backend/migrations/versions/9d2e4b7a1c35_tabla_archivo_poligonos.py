@@ -0,0 +1,44 @@
+"""Tabla archivo_poligonos (indice poligono -> archivos)
+
+Revision ID: 9d2e4b7a1c35
+Revises: f1c05f2b7b87
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2e4b7a1c35'
+down_revision = 'f1c05f2b7b87'
+branch_labels = None
+depends_on = None
+
+CUADRO_RE = re.compile(r'_C(\d+)(?=_|$)')
+
+
+def upgrade():
+    op.create_table('archivo_poligonos',
+    sa.Column('id_archivo', sa.Integer(), nullable=False),
+    sa.Column('poligono', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['id_archivo'], ['archivos.id_archivo'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_archivo', 'poligono')
+    )
+
+    # Completar el indice para los archivos ya cargados
+    archivos = sa.table('archivos', sa.column('id_archivo', sa.Integer), sa.column('nombre', sa.String))
+    archivo_poligonos = sa.table('archivo_poligonos', sa.column('id_archivo', sa.Integer), sa.column('poligono', sa.String))
+    conn = op.get_bind()
+    filas = []
+    for id_archivo, nombre in conn.execute(sa.select(archivos.c.id_archivo, archivos.c.nombre)):
+        for poligono in dict.fromkeys(CUADRO_RE.findall(nombre or '')):
+            filas.append({'id_archivo': id_archivo, 'poligono': poligono})
+    if filas:
+        op.bulk_insert(archivo_poligonos, filas)
+
+
+def downgrade():
+    op.drop_table('archivo_poligonos')
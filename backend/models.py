@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, ForeignKey, DateTime, Text, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -13,7 +13,7 @@ class Usuario(db.Model):
     nom_us = Column(String(100), nullable=False, unique=True)
     pass_us = Column(String(255), nullable=False)
     nombre = Column(String(100), nullable=False)
-    cod_productor = Column(String(50), nullable=True)
+    cod_productor = Column(String(50), nullable=True, unique=True, index=True)
     tipo_us = Column(Integer, ForeignKey('tipo_usuarios.id_tipo'), nullable=False)
     premium = Column(Boolean, default=False)
     
@@ -49,7 +49,10 @@ class KML(db.Model):
     id_kml = Column(Integer, primary_key=True, autoincrement=True)
     ruta_archivo = Column(String(255), nullable=False)
     fecha_subida = Column(DateTime, default=datetime.utcnow)
-    us_asociado = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=False)
+    us_asociado = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=False, index=True)
+    # GeoJSON ya parseado (con area/centroide/bbox por poligono); se carga solo si se pide
+    geojson = deferred(Column(Text, nullable=True))
+    geojson_etag = Column(String(64), nullable=True)
     
     usuario = relationship("Usuario", back_populates="kmls")
     archivos = relationship("Archivo", back_populates="kml", lazy='joined')
@@ -82,12 +85,15 @@ class KMLTaipas(db.Model):
         }
 class Archivo(db.Model):
     __tablename__ = 'archivos'
+    __table_args__ = (
+        Index('ix_archivos_us_asociado_TipoArchivo', 'us_asociado', 'TipoArchivo'),
+    )
     id_archivo = Column(Integer, primary_key=True, autoincrement=True)
-    nombre = Column(String(255), nullable=False)
+    nombre = Column(String(255), nullable=False, index=True)
     disponible = Column(Boolean, default=True)
     ruta_descarga = Column(String(255), nullable=False)
     fecha_subida = Column(DateTime, default=datetime.utcnow)
-    us_asociado = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=False)
+    us_asociado = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=False, index=True)
     kml_asociado = Column(Integer, ForeignKey('kml.id_kml'), nullable=True)
     kml_taipas_asociado = Column(Integer, ForeignKey('kml_taipas.id_kml_taipas'), nullable=True)
     TipoArchivo = Column(Integer, ForeignKey('tipo_archivos.id_tipo_archivo'), nullable=False)
@@ -95,6 +101,7 @@ class Archivo(db.Model):
     usuario = relationship("Usuario", back_populates="archivos")
     kml = relationship("KML", back_populates="archivos")
     kml_taipas = relationship("KMLTaipas", back_populates="archivos")
+    poligonos = relationship("ArchivoPoligono", back_populates="archivo", cascade="all, delete-orphan")
 
     def serialize(self):
         return {
@@ -109,6 +116,22 @@ class Archivo(db.Model):
         }
 
 
+class ArchivoPoligono(db.Model):
+    # Cuadros (polígonos del KML) a los que corresponde un archivo, según los
+    # sufijos _C<n> de su nombre. Se completa al subir el archivo.
+    __tablename__ = 'archivo_poligonos'
+    id_archivo = Column(Integer, ForeignKey('archivos.id_archivo', ondelete='CASCADE'), primary_key=True)
+    poligono = Column(String(50), primary_key=True)
+
+    archivo = relationship("Archivo", back_populates="poligonos")
+
+    def serialize(self):
+        return {
+            'id_archivo': self.id_archivo,
+            'poligono': self.poligono
+        }
+
+
 class TipoArchivo(db.Model):
     __tablename__ = 'tipo_archivos'
     id_tipo_archivo = Column(Integer, primary_key=True, autoincrement=True)
@@ -120,4 +143,11 @@ class TipoArchivo(db.Model):
         return {
             'id_tipo_archivo': self.id_tipo_archivo,
             'tipo': self.tipo
-        }
\ No newline at end of file
+        }
+
+
+class VersionTabla(db.Model):
+    """Version de cada tabla de catalogo, para los ETag (ver versiones_tablas)."""
+    __tablename__ = 'versiones_tablas'
+    tabla = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,11 +1,20 @@
 import os
-import boto3
+# boto3/botocore.config/s3transfer se importan recien al crear el primer
+# cliente: el import de este modulo (y de app_routes) no paga el SDK.
 from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError
 from app_config import Config
+from instrumentacion import instrumentar_s3
 import mimetypes
 from io import BytesIO
 from urllib.parse import quote
 import re
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 
 SENSITIVE_ERROR_CODES = {
@@ -14,6 +23,12 @@ SENSITIVE_ERROR_CODES = {
     'AccessDenied': (403, 'Acceso denegado al archivo en S3'),
     'NoSuchKey': (404, 'Archivo no encontrado en S3'),
     'NoSuchBucket': (404, 'Bucket S3 no encontrado'),
+    'InvalidRange': (416, 'Rango solicitado no valido'),
+    'PreconditionFailed': (412, 'El archivo cambio desde la version indicada'),
+    'NoSuchUpload': (404, 'Upload multipart no encontrado o ya finalizado'),
+    'InvalidPart': (400, 'Alguna parte del upload no es valida'),
+    'InvalidPartOrder': (400, 'Las partes del upload no estan en orden'),
+    'EntityTooSmall': (400, 'Alguna parte del upload es menor al minimo de S3'),
 }
 
 
@@ -25,22 +40,189 @@ class S3ServiceError(Exception):
         self.aws_code = aws_code
 
 
+MB = 1024 * 1024
+
+_transfer_config = None
+
+
+def transfer_config():
+    """TransferConfig compartido por todas las transferencias gestionadas (upload_fileobj, etc.)."""
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+
+        _transfer_config = TransferConfig(
+            multipart_threshold=Config.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=Config.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=Config.S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+    return _transfer_config
+
+
+def _botocore_config():
+    from botocore.config import Config as BotocoreConfig
+
+    return BotocoreConfig(
+        signature_version='s3v4',
+        max_pool_connections=Config.S3_MAX_POOL_CONNECTIONS,
+        retries={'mode': Config.S3_RETRY_MODE, 'max_attempts': Config.S3_MAX_ATTEMPTS},
+        connect_timeout=Config.S3_CONNECT_TIMEOUT,
+        read_timeout=Config.S3_READ_TIMEOUT,
+        tcp_keepalive=Config.S3_TCP_KEEPALIVE,
+    )
+
+
 def _create_s3_client():
     client_kwargs = {
         'region_name': Config.S3_REGION,
+        'config': _botocore_config(),
     }
 
     if Config.AWS_ACCESS_KEY_ID and Config.AWS_SECRET_ACCESS_KEY:
         client_kwargs['aws_access_key_id'] = Config.AWS_ACCESS_KEY_ID
         client_kwargs['aws_secret_access_key'] = Config.AWS_SECRET_ACCESS_KEY
 
-    if Config.S3_REGION:
+    if Config.S3_ENDPOINT_URL:
+        # S3 compatible local (MinIO) para desarrollo y benchmarks
+        client_kwargs['endpoint_url'] = Config.S3_ENDPOINT_URL
+    elif Config.S3_REGION:
         client_kwargs['endpoint_url'] = f'https://s3.{Config.S3_REGION}.amazonaws.com'
 
-    return boto3.client('s3', **client_kwargs)
-
-
-s3 = _create_s3_client()
+    import boto3
+
+    # Una Session propia por cliente: la sesion default de boto3 no es thread-safe.
+    return instrumentar_s3(boto3.session.Session().client('s3', **client_kwargs))
+
+
+_cliente_proceso = None
+_cliente_pid = None
+_cliente_lock = threading.Lock()
+_cliente_hilo = threading.local()
+
+
+def obtener_cliente():
+    """
+    Cliente S3 del proceso actual, creado en el primer uso y recreado si el
+    proceso se forkeo. Con S3_CLIENTE_POR_HILO cada hilo tiene el suyo.
+    """
+    global _cliente_proceso, _cliente_pid
+    pid = os.getpid()
+
+    if Config.S3_CLIENTE_POR_HILO:
+        if getattr(_cliente_hilo, 'pid', None) != pid:
+            _cliente_hilo.cliente = _create_s3_client()
+            _cliente_hilo.pid = pid
+        return _cliente_hilo.cliente
+
+    if _cliente_pid != pid:
+        with _cliente_lock:
+            if _cliente_pid != pid:
+                _cliente_proceso = _create_s3_client()
+                _cliente_pid = pid
+    return _cliente_proceso
+
+
+def reiniciar_cliente():
+    """
+    Descarta los clientes S3 existentes; el proximo obtener_cliente() crea uno
+    nuevo. Se llama en cada worker despues del fork (ver gunicorn.conf.py).
+    """
+    global _cliente_proceso, _cliente_pid
+    with _cliente_lock:
+        _cliente_proceso = None
+        _cliente_pid = None
+    _cliente_hilo.__dict__.clear()
+
+
+class _CacheUrlsFirmadas:
+    """
+    Cache LRU en memoria del proceso para URLs firmadas, con expiracion por TTL.
+
+    La clave es (clave S3, expiracion): URLs pedidas con distinta expiracion no
+    se mezclan. Una entrada se reutiliza mientras le quede al menos
+    `validez_minima` de su vida util; despues se descarta y se vuelve a firmar.
+    `_expiraciones` indexa clave S3 -> expiraciones cacheadas, para invalidar
+    una clave sin recorrer todo el cache.
+    """
+
+    def __init__(self, max_entradas, validez_minima):
+        self.max_entradas = max_entradas
+        self.validez_minima = validez_minima
+        self._entradas = OrderedDict()
+        self._expiraciones = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def obtener(self, clave, expiracion):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get((clave, expiracion))
+            if entrada is not None:
+                url, reutilizable_hasta = entrada
+                if ahora < reutilizable_hasta:
+                    self._entradas.move_to_end((clave, expiracion))
+                    self.hits += 1
+                    return url
+                self._quitar((clave, expiracion))
+            self.misses += 1
+            return None
+
+    def guardar(self, clave, expiracion, url):
+        if self.max_entradas <= 0:
+            return
+        reutilizable_hasta = time.monotonic() + expiracion * (1 - self.validez_minima)
+        with self._lock:
+            self._entradas[(clave, expiracion)] = (url, reutilizable_hasta)
+            self._entradas.move_to_end((clave, expiracion))
+            self._expiraciones.setdefault(clave, set()).add(expiracion)
+            while len(self._entradas) > self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+                self.evictions += 1
+
+    def _quitar(self, entrada):
+        # Con el lock tomado: borra la entrada y su referencia en el indice
+        del self._entradas[entrada]
+        clave, expiracion = entrada
+        expiraciones = self._expiraciones[clave]
+        expiraciones.discard(expiracion)
+        if not expiraciones:
+            del self._expiraciones[clave]
+
+    def invalidar(self, *claves):
+        with self._lock:
+            for clave in claves:
+                for expiracion in list(self._expiraciones.get(clave, ())):
+                    self._quitar((clave, expiracion))
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._expiraciones.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+            }
+
+
+_cache_urls = _CacheUrlsFirmadas(
+    max_entradas=Config.S3_URL_CACHE_MAX_ENTRADAS,
+    validez_minima=Config.S3_URL_CACHE_VALIDEZ_MINIMA,
+)
+
+
+def estadisticas_cache_urls():
+    return _cache_urls.estadisticas()
 
 
 def _log_s3_client_error(action, error, key=None):
@@ -111,8 +293,15 @@ def subir_archivo_a_s3(archivo, nombre_archivo, carpeta=None, return_url=False):
             'ContentDisposition': f'attachment; filename="{quote(nombre_archivo.split("/")[-1])}"'  # Asegurarse de que el nombre del archivo esté codificado correctamente
         }
 
-        # Subir el archivo con los headers
-        s3.upload_fileobj(archivo, Config.S3_BUCKET_NAME, nombre_archivo, ExtraArgs=extra_args)
+        # Subir el archivo con los headers; los grandes con el motor multipart
+        # (partes en paralelo con checksum por parte)
+        if upload_size >= transfer_config().multipart_threshold:
+            subir_multipart(archivo, nombre_archivo, extra_args=extra_args)
+        else:
+            obtener_cliente().upload_fileobj(
+                archivo, Config.S3_BUCKET_NAME, nombre_archivo,
+                ExtraArgs=extra_args, Config=transfer_config(),
+            )
         print(f"[S3_UPLOAD] key={nombre_archivo} bytes={upload_size} content_type={content_type}")
         print(f"Archivo {nombre_archivo} subido exitosamente a S3 con Content-Type {content_type}")
 
@@ -129,15 +318,24 @@ def subir_archivo_a_s3(archivo, nombre_archivo, carpeta=None, return_url=False):
         return "Error al subir archivo a S3"
     
 
+def _content_type_de_clave(ruta_s3):
+    content_type, _ = mimetypes.guess_type(ruta_s3)
+    if content_type is None:
+        content_type = 'application/octet-stream'
+    if ruta_s3.lower().endswith('.zip'):
+        content_type = 'application/zip'
+    return content_type
+
+
 def generar_url_firmada(ruta_s3, expiracion=3600):
+    url = _cache_urls.obtener(ruta_s3, expiracion)
+    if url is not None:
+        return url
+
     try:
-        content_type, _ = mimetypes.guess_type(ruta_s3)
-        if content_type is None:
-            content_type = 'application/octet-stream'
-        if ruta_s3.lower().endswith('.zip'):
-            content_type = 'application/zip'
+        content_type = _content_type_de_clave(ruta_s3)
 
-        head = s3.head_object(Bucket=Config.S3_BUCKET_NAME, Key=ruta_s3)
+        head = obtener_cliente().head_object(Bucket=Config.S3_BUCKET_NAME, Key=ruta_s3)
         print(
             "[S3_SIGN] "
             f"bucket={Config.S3_BUCKET_NAME} "
@@ -148,7 +346,7 @@ def generar_url_firmada(ruta_s3, expiracion=3600):
             f"expires_in={expiracion}"
         )
 
-        url = s3.generate_presigned_url(
+        url = obtener_cliente().generate_presigned_url(
             ClientMethod='get_object',
             Params={
                 'Bucket': Config.S3_BUCKET_NAME,
@@ -161,6 +359,7 @@ def generar_url_firmada(ruta_s3, expiracion=3600):
 
         print(f"[S3_SIGN] presigned_url_created key={ruta_s3} expires_in={expiracion}")
 
+        _cache_urls.guardar(ruta_s3, expiracion, url)
         return url
     except ClientError as e:
         _log_s3_client_error('generate_presigned_url', e, ruta_s3)
@@ -169,15 +368,88 @@ def generar_url_firmada(ruta_s3, expiracion=3600):
         _log_s3_unexpected_error('generate_presigned_url', e, ruta_s3)
         return None
 
+def _firmar_get_object(ruta_s3, expiracion):
+    # generate_presigned_url firma localmente con las credenciales del cliente:
+    # no hace ninguna llamada de red a S3.
+    return obtener_cliente().generate_presigned_url(
+        ClientMethod='get_object',
+        Params={
+            'Bucket': Config.S3_BUCKET_NAME,
+            'Key': ruta_s3,
+            'ResponseContentDisposition': f'attachment; filename="{os.path.basename(ruta_s3)}"',
+            'ResponseContentType': _content_type_de_clave(ruta_s3),
+        },
+        ExpiresIn=expiracion
+    )
+
+
+def listar_claves_existentes(prefijo):
+    """
+    Devuelve el set de claves S3 bajo `prefijo`, recorriendo list_objects_v2
+    paginado (1000 claves por pagina). Sirve para verificar existencia en lote
+    en lugar de un head_object por archivo.
+    """
+    claves = set()
+    paginator = obtener_cliente().get_paginator('list_objects_v2')
+    for pagina in paginator.paginate(Bucket=Config.S3_BUCKET_NAME, Prefix=prefijo):
+        for objeto in pagina.get('Contents', []):
+            claves.add(objeto['Key'])
+    return claves
+
+
+def generar_urls_firmadas(claves, expiracion=3600, verificar_existencia=False, prefijo=None):
+    """
+    Firma en lote URLs de descarga para `claves`, sin llamadas de red por archivo.
+
+    Retorna un dict {clave: url}. Si `verificar_existencia` es True se lista una
+    sola vez el prefijo (por defecto, el prefijo comun del productor) y las claves
+    que no estan en S3 quedan con valor None.
+    """
+    claves = list(dict.fromkeys(claves))
+    urls = {}
+    if not claves:
+        return urls
+
+    existentes = None
+    if verificar_existencia:
+        if prefijo is None:
+            prefijo = os.path.commonprefix(claves)
+            prefijo = prefijo[:prefijo.rfind('/') + 1]
+        try:
+            existentes = listar_claves_existentes(prefijo)
+        except ClientError as e:
+            _log_s3_client_error('list_objects_v2', e, prefijo)
+        except Exception as e:
+            _log_s3_unexpected_error('list_objects_v2', e, prefijo)
+
+    for clave in claves:
+        if existentes is not None and clave not in existentes:
+            urls[clave] = None
+            continue
+        url = _cache_urls.obtener(clave, expiracion)
+        if url is None:
+            try:
+                url = _firmar_get_object(clave, expiracion)
+                _cache_urls.guardar(clave, expiracion, url)
+            except Exception as e:
+                _log_s3_unexpected_error('generate_presigned_url', e, clave)
+        urls[clave] = url
+
+    print(
+        "[S3_SIGN] "
+        f"batch claves={len(claves)} "
+        f"firmadas={sum(1 for url in urls.values() if url)} "
+        f"verificar_existencia={verificar_existencia} "
+        f"expires_in={expiracion}"
+    )
+    return urls
+
+
 def descargar_archivo_de_s3(ruta_s3):
     try:
-        content_type, _ = mimetypes.guess_type(ruta_s3)
-        if content_type is None:
-            content_type = 'application/octet-stream'
-        if ruta_s3.lower().endswith('.zip'):
-            content_type = 'application/zip'
+        content_type = _content_type_de_clave(ruta_s3)
 
-        response = s3.get_object(Bucket=Config.S3_BUCKET_NAME, Key=ruta_s3)
+        response = obtener_cliente().get_object(Bucket=Config.S3_BUCKET_NAME, Key=ruta_s3)
         data = response['Body'].read()
         buffer = BytesIO(data)
         buffer.seek(0)
@@ -211,6 +483,370 @@ def descargar_archivo_de_s3(ruta_s3):
     except Exception as e:
         raise _log_s3_unexpected_error('get_object', e, ruta_s3)
 
+S3_MIN_PART_SIZE = 5 * MB
+S3_MAX_PARTS = 10000
+
+
+def _headers_subida(clave):
+    content_type, _ = mimetypes.guess_type(clave)
+    return {
+        'ContentType': content_type or 'application/octet-stream',
+        'ContentDisposition': f'attachment; filename="{quote(clave.split("/")[-1])}"',
+    }
+
+
+def iniciar_upload_multipart(clave, tamano, expiracion=3600):
+    """
+    Crea un multipart upload en S3 y firma una URL de upload_part por parte,
+    para que el navegador suba directo a S3 (el bucket debe permitir PUT por
+    CORS y exponer el header ETag). Retorna {upload_id, key, tamano_parte, partes}.
+    """
+    tamano_parte = max(
+        Config.S3_MULTIPART_CHUNKSIZE_MB * MB,
+        S3_MIN_PART_SIZE,
+        -(-tamano // S3_MAX_PARTS),
+    )
+    cantidad_partes = max(1, -(-tamano // tamano_parte))
+    try:
+        cliente = obtener_cliente()
+        respuesta = cliente.create_multipart_upload(
+            Bucket=Config.S3_BUCKET_NAME, Key=clave, **_headers_subida(clave)
+        )
+        upload_id = respuesta['UploadId']
+        partes = [
+            {
+                'numero': numero,
+                'url': cliente.generate_presigned_url(
+                    ClientMethod='upload_part',
+                    Params={
+                        'Bucket': Config.S3_BUCKET_NAME,
+                        'Key': clave,
+                        'UploadId': upload_id,
+                        'PartNumber': numero,
+                    },
+                    ExpiresIn=expiracion,
+                ),
+            }
+            for numero in range(1, cantidad_partes + 1)
+        ]
+        print(
+            "[S3_UPLOAD] "
+            f"multipart_iniciado key={clave} bytes={tamano} "
+            f"partes={cantidad_partes} tamano_parte={tamano_parte}"
+        )
+        return {'upload_id': upload_id, 'key': clave, 'tamano_parte': tamano_parte, 'partes': partes}
+    except ClientError as e:
+        raise _log_s3_client_error('create_multipart_upload', e, clave)
+    except Exception as e:
+        raise _log_s3_unexpected_error('create_multipart_upload', e, clave)
+
+
+def completar_upload_multipart(clave, upload_id, partes):
+    """
+    Completa el multipart upload con las partes [{numero, etag}] que subio el
+    cliente y verifica el objeto con un unico head_object. Retorna el head.
+    """
+    try:
+        cliente = obtener_cliente()
+        cliente.complete_multipart_upload(
+            Bucket=Config.S3_BUCKET_NAME,
+            Key=clave,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': [
+                {'PartNumber': int(parte['numero']), 'ETag': parte['etag']}
+                for parte in sorted(partes, key=lambda p: int(p['numero']))
+            ]},
+        )
+        head = cliente.head_object(Bucket=Config.S3_BUCKET_NAME, Key=clave)
+        print(f"[S3_UPLOAD] multipart_completado key={clave} bytes={head.get('ContentLength')}")
+        return head
+    except ClientError as e:
+        raise _log_s3_client_error('complete_multipart_upload', e, clave)
+    except Exception as e:
+        raise _log_s3_unexpected_error('complete_multipart_upload', e, clave)
+
+
+def abortar_upload_multipart(clave, upload_id):
+    """Descarta un multipart upload y las partes ya subidas. Retorna True/False."""
+    try:
+        obtener_cliente().abort_multipart_upload(
+            Bucket=Config.S3_BUCKET_NAME, Key=clave, UploadId=upload_id
+        )
+        print(f"[S3_UPLOAD] multipart_abortado key={clave}")
+        return True
+    except ClientError as e:
+        _log_s3_client_error('abort_multipart_upload', e, clave)
+        return False
+    except Exception as e:
+        _log_s3_unexpected_error('abort_multipart_upload', e, clave)
+        return False
+
+
+def _crt_disponible():
+    """awscrt es opcional (boto3[crt]); se prueba recien cuando se pide CRC32C."""
+    try:
+        import awscrt.checksums  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _checksum_sha256(datos):
+    return base64.b64encode(hashlib.sha256(datos).digest()).decode('ascii')
+
+
+def _checksum_crc32c(datos):
+    from awscrt import checksums as crt_checksums
+
+    return base64.b64encode(crt_checksums.crc32c(datos).to_bytes(4, 'big')).decode('ascii')
+
+
+CHECKSUMS = {
+    'SHA256': _checksum_sha256,
+    'CRC32C': _checksum_crc32c,
+}
+
+
+def _leer_parte(archivo, tamano):
+    """Lee hasta `tamano` bytes; los streams de red pueden devolver lecturas cortas."""
+    datos = archivo.read(tamano)
+    if not datos or len(datos) == tamano:
+        return datos
+    partes = [datos]
+    faltan = tamano - len(datos)
+    while faltan:
+        datos = archivo.read(faltan)
+        if not datos:
+            break
+        partes.append(datos)
+        faltan -= len(datos)
+    return b''.join(partes)
+
+
+def subir_multipart(archivo, clave, tamano_parte=None, concurrencia=None,
+                    checksum=None, progreso=None, extra_args=None, tamano=None):
+    """
+    Sube `archivo` (file-like, no hace falta que sea seekable: sirve
+    request.stream) a `clave` con un multipart upload explicito. `tamano` es el
+    total si se conoce de antemano (p.ej. Content-Length).
+
+    - Las partes se leen en orden y se suben en paralelo con `concurrencia`
+      hilos; nunca hay mas de 2*concurrencia partes en memoria.
+    - Cada parte lleva su checksum (`checksum`: 'SHA256' o 'CRC32C') y S3 lo
+      valida al recibirla y al completar.
+    - `progreso(bytes_subidos, bytes_totales)` se llama al confirmar cada parte
+      (desde los hilos del pool; bytes_totales es None si no se conoce).
+    - Si algo falla se aborta el upload para no dejar partes huerfanas.
+
+    Retorna {'key', 'bytes', 'partes', 'etag', 'checksum'}.
+    """
+    tamano_parte = max(tamano_parte or Config.S3_MULTIPART_CHUNKSIZE_MB * MB, S3_MIN_PART_SIZE)
+    concurrencia = concurrencia or Config.S3_MAX_CONCURRENCY
+    algoritmo = (checksum or Config.S3_CHECKSUM_ALGORITMO).upper()
+    if algoritmo not in CHECKSUMS:
+        raise S3ServiceError(f'Algoritmo de checksum no soportado: {algoritmo}', status_code=500)
+    if algoritmo == 'CRC32C' and not _crt_disponible():
+        raise S3ServiceError('CRC32C requiere el paquete awscrt (boto3[crt])', status_code=500)
+    calcular_checksum = CHECKSUMS[algoritmo]
+    campo_checksum = f'Checksum{algoritmo}'
+
+    total = tamano
+    if total is None and getattr(archivo, 'seekable', lambda: False)():
+        try:
+            archivo.seek(0, os.SEEK_END)
+            total = archivo.tell()
+            archivo.seek(0)
+        except (OSError, ValueError):
+            total = None
+    if total is not None and -(-total // tamano_parte) > S3_MAX_PARTS:
+        tamano_parte = -(-total // S3_MAX_PARTS)
+
+    cliente = obtener_cliente()
+    try:
+        upload_id = cliente.create_multipart_upload(
+            Bucket=Config.S3_BUCKET_NAME,
+            Key=clave,
+            ChecksumAlgorithm=algoritmo,
+            **(extra_args or _headers_subida(clave)),
+        )['UploadId']
+    except ClientError as e:
+        raise _log_s3_client_error('create_multipart_upload', e, clave)
+
+    lock = threading.Lock()
+    buffers = threading.BoundedSemaphore(concurrencia * 2)
+    partes = []
+    subidos = [0]
+    inicio = time.perf_counter()
+
+    def _subir_parte(numero, datos):
+        try:
+            valor_checksum = calcular_checksum(datos)
+            respuesta = cliente.upload_part(
+                Bucket=Config.S3_BUCKET_NAME,
+                Key=clave,
+                UploadId=upload_id,
+                PartNumber=numero,
+                Body=datos,
+                ChecksumAlgorithm=algoritmo,
+                **{campo_checksum: valor_checksum},
+            )
+            with lock:
+                partes.append({
+                    'PartNumber': numero,
+                    'ETag': respuesta['ETag'],
+                    campo_checksum: respuesta.get(campo_checksum, valor_checksum),
+                })
+                subidos[0] += len(datos)
+                bytes_subidos = subidos[0]
+            if progreso:
+                progreso(bytes_subidos, total)
+        finally:
+            buffers.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            futures = []
+            numero = 0
+            while True:
+                buffers.acquire()
+                if any(f.done() and f.exception() for f in futures):
+                    buffers.release()
+                    break
+                datos = _leer_parte(archivo, tamano_parte)
+                if not datos and numero > 0:
+                    buffers.release()
+                    break
+                numero += 1
+                if numero > S3_MAX_PARTS:
+                    buffers.release()
+                    raise S3ServiceError('El archivo supera la cantidad maxima de partes de S3', status_code=400)
+                futures.append(pool.submit(_subir_parte, numero, datos))
+                if len(datos) < tamano_parte:
+                    break
+            for future in futures:
+                future.result()
+
+        respuesta = cliente.complete_multipart_upload(
+            Bucket=Config.S3_BUCKET_NAME,
+            Key=clave,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': sorted(partes, key=lambda p: p['PartNumber'])},
+        )
+    except Exception as e:
+        abortar_upload_multipart(clave, upload_id)
+        if isinstance(e, S3ServiceError):
+            raise
+        if isinstance(e, ClientError):
+            raise _log_s3_client_error('upload_part', e, clave)
+        raise _log_s3_unexpected_error('upload_part', e, clave)
+
+    segundos = time.perf_counter() - inicio
+    print(
+        "[S3_UPLOAD] "
+        f"multipart key={clave} bytes={subidos[0]} partes={len(partes)} "
+        f"tamano_parte={tamano_parte} concurrencia={concurrencia} checksum={algoritmo} "
+        f"segundos={segundos:.2f}"
+    )
+    return {
+        'key': clave,
+        'bytes': subidos[0],
+        'partes': len(partes),
+        'etag': respuesta.get('ETag'),
+        'checksum': respuesta.get(campo_checksum),
+    }
+
+
+def limpiar_uploads_huerfanos(prefijo='', antiguedad=timedelta(hours=24)):
+    """
+    Aborta los multipart uploads bajo `prefijo` iniciados hace mas de
+    `antiguedad` (p.ej. de procesos que murieron a mitad de una subida).
+    Retorna la lista de claves abortadas.
+    """
+    limite = datetime.now(timezone.utc) - antiguedad
+    abortados = []
+    try:
+        paginator = obtener_cliente().get_paginator('list_multipart_uploads')
+        for pagina in paginator.paginate(Bucket=Config.S3_BUCKET_NAME, Prefix=prefijo):
+            for upload in pagina.get('Uploads', []):
+                if upload['Initiated'] < limite and abortar_upload_multipart(upload['Key'], upload['UploadId']):
+                    abortados.append(upload['Key'])
+    except ClientError as e:
+        _log_s3_client_error('list_multipart_uploads', e, prefijo)
+    print(f"[S3_UPLOAD] uploads_huerfanos_abortados prefijo={prefijo} cantidad={len(abortados)}")
+    return abortados
+
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def abrir_stream_de_s3(ruta_s3, rango=None, si_coincide=None, si_no_modificado_desde=None):
+    """
+    Abre el objeto S3 sin leerlo a memoria. Devuelve (body, metadata), donde
+    body es el StreamingBody de botocore. `rango` es un header Range HTTP
+    (p.ej. 'bytes=1000-'); si se pasa, metadata['content_range'] trae el
+    Content-Range que devolvio S3 para responder 206. `si_coincide` (ETag) y
+    `si_no_modificado_desde` (datetime) son condiciones de S3: si no se
+    cumplen se lanza S3ServiceError con status 412.
+    """
+    try:
+        params = {'Bucket': Config.S3_BUCKET_NAME, 'Key': ruta_s3}
+        if rango:
+            params['Range'] = rango
+        if si_coincide:
+            params['IfMatch'] = si_coincide
+        if si_no_modificado_desde:
+            params['IfUnmodifiedSince'] = si_no_modificado_desde
+
+        response = obtener_cliente().get_object(**params)
+        metadata = {
+            'key': ruta_s3,
+            'filename': os.path.basename(ruta_s3),
+            'content_type': _content_type_de_clave(ruta_s3),
+            's3_content_type': response.get('ContentType'),
+            'content_length': response.get('ContentLength'),
+            'content_range': response.get('ContentRange'),
+            'etag': response.get('ETag'),
+            'last_modified': response.get('LastModified'),
+        }
+        print(
+            "[S3_DOWNLOAD] "
+            f"stream key={ruta_s3} "
+            f"bytes={metadata['content_length']} "
+            f"range={rango or ''} "
+            f"content_type={metadata['content_type']}"
+        )
+        return response['Body'], metadata
+    except ClientError as e:
+        raise _log_s3_client_error('get_object', e, ruta_s3)
+    except (NoCredentialsError, PartialCredentialsError) as e:
+        print(
+            "[S3_ERROR] "
+            f"action=get_object bucket={Config.S3_BUCKET_NAME} key={ruta_s3} "
+            f"error_type={type(e).__name__}"
+        )
+        raise S3ServiceError('Credenciales AWS no configuradas correctamente', status_code=503)
+    except Exception as e:
+        raise _log_s3_unexpected_error('get_object', e, ruta_s3)
+
+
+def tamano_de_objeto_s3(ruta_s3):
+    """Tamaño en bytes del objeto, o None si no se puede consultar."""
+    try:
+        return obtener_cliente().head_object(Bucket=Config.S3_BUCKET_NAME, Key=ruta_s3)['ContentLength']
+    except Exception as e:
+        print(f"[S3_ERROR] action=head_object key={ruta_s3} error_type={type(e).__name__}")
+        return None
+
+
+def iterar_stream_de_s3(body, chunk_size=STREAM_CHUNK_SIZE):
+    """Generador de chunks de un StreamingBody; siempre cierra la conexion."""
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+
 def eliminar_archivo_de_s3(ruta_completa_s3):
     try:
         print(f"Intentando eliminar el archivo: {ruta_completa_s3} del bucket: {Config.S3_BUCKET_NAME}")
@@ -226,7 +862,8 @@ def eliminar_archivo_de_s3(ruta_completa_s3):
         print(f"Clave del archivo a eliminar: {clave}")
 
         # Eliminar el archivo de S3
-        response = s3.delete_object(Bucket=Config.S3_BUCKET_NAME, Key=clave)
+        response = obtener_cliente().delete_object(Bucket=Config.S3_BUCKET_NAME, Key=clave)
+        _cache_urls.invalidar(clave)
         print(f"Respuesta de S3: {response}")
         
         print(f"Archivo eliminado exitosamente: {ruta_completa_s3}")
@@ -235,3 +872,42 @@ def eliminar_archivo_de_s3(ruta_completa_s3):
         print(f"Error al eliminar archivo de S3: {e}")
         return False
 
+
+S3_MAX_DELETE_KEYS = 1000  # limite de DeleteObjects por request
+
+
+def eliminar_archivos_de_s3(rutas):
+    """
+    Elimina varias claves (o URLs completas) con DeleteObjects, en grupos de
+    hasta 1000 claves por request.
+    Retorna {ruta: None si se elimino | mensaje de error}.
+    """
+    prefijo_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.S3_REGION}.amazonaws.com/"
+    claves = {}
+    for ruta in rutas:
+        clave = ruta[len(prefijo_url):] if ruta.startswith(prefijo_url) else ruta
+        claves.setdefault(clave, []).append(ruta)
+
+    resultados = {}
+    lista = list(claves)
+    for inicio in range(0, len(lista), S3_MAX_DELETE_KEYS):
+        grupo = lista[inicio:inicio + S3_MAX_DELETE_KEYS]
+        try:
+            respuesta = obtener_cliente().delete_objects(
+                Bucket=Config.S3_BUCKET_NAME,
+                Delete={'Objects': [{'Key': clave} for clave in grupo], 'Quiet': True},
+            )
+            errores = {e['Key']: f"{e.get('Code')}: {e.get('Message')}" for e in respuesta.get('Errors', [])}
+        except ClientError as e:
+            mensaje = _log_s3_client_error('delete_objects', e, grupo[0]).message
+            errores = {clave: mensaje for clave in grupo}
+        except Exception as e:
+            mensaje = _log_s3_unexpected_error('delete_objects', e, grupo[0]).message
+            errores = {clave: mensaje for clave in grupo}
+
+        _cache_urls.invalidar(*grupo)
+        for clave in grupo:
+            for ruta in claves[clave]:
+                resultados[ruta] = errores.get(clave)
+        print(f"[S3_DELETE] delete_objects claves={len(grupo)} errores={len(errores)}")
+    return resultados
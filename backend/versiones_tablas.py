@@ -0,0 +1,36 @@
+# versiones_tablas.py
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from models import db, VersionTabla
+
+# Tablas de catalogo cuyos GET se responden con ETag (ver app_routes.condicional).
+TABLAS_VERSIONADAS = ('tipo_archivos', 'tipo_usuarios', 'usuarios')
+
+# La version de cada tabla vive en la base (tabla versiones_tablas) y se
+# incrementa en la misma transaccion que la escritura: todos los workers y
+# todas las instancias (varias replicas, o la vieja y la nueva durante un
+# deploy) ven el cambio apenas se commitea. Un GET la lee con una consulta por
+# clave primaria en lugar de la consulta completa.
+
+
+def versiones(*tablas):
+    """{tabla: version}; las tablas sin fila (base sin migrar) no aparecen."""
+    filas = db.session.execute(
+        select(VersionTabla.tabla, VersionTabla.version).where(VersionTabla.tabla.in_(tablas))
+    )
+    return dict(filas.all())
+
+
+@event.listens_for(Session, 'after_flush')
+def _incrementar_versiones(session, flush_context):
+    # En after_flush new/dirty/deleted todavia muestran lo que se acaba de escribir
+    tablas = {
+        getattr(obj, '__tablename__', None) for obj in (*session.new, *session.dirty, *session.deleted)
+    } & set(TABLAS_VERSIONADAS)
+    if tablas:
+        session.connection().execute(
+            update(VersionTabla)
+            .where(VersionTabla.tabla.in_(sorted(tablas)))
+            .values(version=VersionTabla.version + 1)
+        )
@@ -1,5 +1,10 @@
 import React, { useState, useEffect } from 'react'; // Añade useEffect aquí
 
+// Desde este tamaño el archivo se sube directo a S3 con URLs firmadas por parte
+const UMBRAL_SUBIDA_DIRECTA = 100 * 1024 * 1024;
+// El resto se manda en lotes a /api/subir_archivos (una transaccion por lote)
+const ARCHIVOS_POR_LOTE = 20;
+
 const CargarArchivos = ({ productorId, tiposArchivo, archivosPrecargados = [], onBack }) => {
   const [archivos, setArchivos] = useState([]);
   const [tipoArchivo, setTipoArchivo] = useState('');
@@ -20,6 +25,48 @@ const CargarArchivos = ({ productorId, tiposArchivo, archivosPrecargados = [], o
     }
   };
 
+  const postJson = (ruta, body, token) =>
+    fetch(`${apiUrl}${ruta}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+      body: JSON.stringify(body),
+    });
+
+  const subirDirectoAS3 = async (file, token) => {
+    const destino = { productorId, tipoArchivo };
+    const inicio = await postJson('api/subir_archivo/iniciar', {
+      ...destino,
+      nombre: file.name,
+      tamano: file.size,
+    }, token);
+    if (!inicio.ok) throw new Error(`Error iniciando la subida de ${file.name}`);
+    const { key, upload_id, tamano_parte, partes } = await inicio.json();
+
+    try {
+      const partesSubidas = [];
+      for (const parte of partes) {
+        const desde = (parte.numero - 1) * tamano_parte;
+        const respuesta = await fetch(parte.url, {
+          method: 'PUT',
+          body: file.slice(desde, desde + tamano_parte),
+        });
+        if (!respuesta.ok) throw new Error(`Error subiendo ${file.name}`);
+        partesSubidas.push({ numero: parte.numero, etag: respuesta.headers.get('ETag') });
+      }
+
+      const fin = await postJson('api/subir_archivo/completar', {
+        ...destino,
+        key,
+        upload_id,
+        partes: partesSubidas,
+      }, token);
+      if (!fin.ok) throw new Error(`Error completando la subida de ${file.name}`);
+    } catch (error) {
+      await postJson('api/subir_archivo/abortar', { ...destino, key, upload_id }, token).catch(() => {});
+      throw error;
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setIsUploading(true);
@@ -27,19 +74,32 @@ const CargarArchivos = ({ productorId, tiposArchivo, archivosPrecargados = [], o
     try {
       const token = localStorage.getItem("token");
       
+      const pequenos = [];
       for (const file of archivos) {
+        if (file.size >= UMBRAL_SUBIDA_DIRECTA) {
+          await subirDirectoAS3(file, token);
+        } else {
+          pequenos.push(file);
+        }
+      }
+
+      for (let i = 0; i < pequenos.length; i += ARCHIVOS_POR_LOTE) {
         const formData = new FormData();
-        formData.append('archivo', file);
+        pequenos.slice(i, i + ARCHIVOS_POR_LOTE).forEach(file => formData.append('archivos', file));
         formData.append('tipoArchivo', tipoArchivo);
         formData.append('productorId', productorId);
 
-        const response = await fetch(`${apiUrl}api/subir_archivo`, {
+        const response = await fetch(`${apiUrl}api/subir_archivos`, {
           method: 'POST',
           headers: { Authorization: `Bearer ${token}` },
           body: formData
         });
 
-        if (!response.ok) throw new Error(`Error subiendo ${file.name}`);
+        const resultado = await response.json().catch(() => null);
+        const fallidos = (resultado?.archivos || []).filter(a => !a.ok).map(a => a.nombre);
+        if (!response.ok || response.status === 207) {
+          throw new Error(`Error subiendo ${fallidos.length ? fallidos.join(', ') : 'archivos'}`);
+        }
       }
 
       alert("Archivos subidos exitosamente!");
@@ -77,7 +77,7 @@ const CargarKml = ({ productorId, onClose, onUploaded }) => {
             type="file"
             className="form-control"
             id="archivo"
-            accept=".kml"
+            accept=".kml,.kmz"
             onChange={handleFileChange}
             disabled={isUploading}
           />
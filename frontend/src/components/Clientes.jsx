@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from "react";
 import Select from "react-select";
 
+const CLIENTES_POR_PAGINA = 500;
+
 const Clientes = () => {
   const apiUrl = "https://appproducotres-backend.onrender.com/";
 
@@ -61,13 +63,28 @@ const Clientes = () => {
   const fetchClientes = async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${apiUrl}api/usuarios/productores`);
-      if (response.ok) {
-        const data = await response.json();
-        setClientes(data);
-      }
+      // Paginado por id y solo con los campos que usa esta pantalla
+      const campos = "id_usuario,nom_us,nombre,cod_productor,premium";
+      const todos = [];
+      let afterId = "";
+      do {
+        const response = await fetch(
+          `${apiUrl}api/usuarios/productores?fields=${campos}&limit=${CLIENTES_POR_PAGINA}&after_id=${afterId}`
+        );
+        // Una pagina fallida invalida todo el listado: no se muestra a medias
+        if (!response.ok) {
+          throw new Error(`Error ${response.status} al obtener la pagina de clientes`);
+        }
+        todos.push(...(await response.json()));
+        afterId = response.headers.get("X-Next-After-Id") || "";
+      } while (afterId);
+      setClientes(todos);
     } catch (error) {
       console.error("Error al obtener clientes:", error);
+      setMessage({
+        type: "error",
+        text: "No se pudo obtener la lista completa de clientes",
+      });
     } finally {
       setLoading(false);
     }
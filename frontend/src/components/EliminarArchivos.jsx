@@ -81,6 +81,37 @@ const EliminarArchivos = ({ productorId, onClose }) => {
       alert(`Error: ${error.message}`);
     }
 };
+
+  const eliminarTodos = async () => {
+    if (!window.confirm(`¿Estás seguro de eliminar los ${archivos.length} archivos?`)) return;
+
+    try {
+      const token = localStorage.getItem("token");
+      const response = await fetch(`${apiUrl}api/eliminar_archivos`, {
+        method: "DELETE",
+        headers: {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ ids: archivos.map(a => a.id_archivo) })
+      });
+
+      const responseData = await response.json();
+      const eliminados = new Set(
+        (responseData.archivos || []).filter(a => a.ok).map(a => a.id_archivo)
+      );
+      setArchivos(prev => prev.filter(a => !eliminados.has(a.id_archivo)));
+
+      if (!response.ok || response.status === 207) {
+        throw new Error(`Se eliminaron ${responseData.eliminados || 0} de ${archivos.length} archivos`);
+      }
+      alert("Archivos eliminados correctamente");
+      window.location.reload();
+    } catch (error) {
+      console.error("Error al eliminar:", error);
+      alert(`Error: ${error.message}`);
+    }
+  };
   
 
   return (
@@ -135,6 +166,11 @@ const EliminarArchivos = ({ productorId, onClose }) => {
             )}
           </div>
           <div className="modal-footer">
+            {archivos.length > 1 && (
+              <button type="button" className="btn btn-danger me-auto" onClick={eliminarTodos}>
+                <i className="bi bi-trash"></i> Eliminar todos
+              </button>
+            )}
             <button type="button" className="btn btn-secondary" onClick={onClose}>
               Cerrar
             </button>
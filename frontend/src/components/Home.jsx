@@ -11,7 +11,6 @@ import "leaflet-geometryutil";
 import "leaflet-kml";
 import { MapContainer, TileLayer, useMap } from "react-leaflet";
 import "leaflet/dist/leaflet.css";
-import * as toGeoJSON from "@mapbox/togeojson";
 import CargarArchivos from "./CargarArchivos";
 import EliminarArchivo from "./EliminarArchivos";
 import CargarKml from "./CargarKml";
@@ -371,26 +370,21 @@ const Home = () => {
     navigate("/");
   };
 
-  const cargarKmlEnMapa = (kmlUrl, nombre, archivos) => {
+  const cargarKmlEnMapa = (geojsonUrl, nombre, archivosPorPoligono) => {
     return new Promise((resolve, reject) => {
-      fetch(kmlUrl)
-        .then((res) => res.text())
-        .then((kmlText) => {
-          const parser = new DOMParser();
-          const kml = parser.parseFromString(kmlText, "text/xml");
-          const geojson = toGeoJSON.kml(kml);
+      // GeoJSON precalculado en el backend al subir el KML
+      fetch(geojsonUrl)
+        .then((res) => {
+          if (!res.ok) throw new Error(`Error ${res.status} cargando GeoJSON`);
+          return res.json();
+        })
+        .then((geojson) => {
 
           const capa = L.geoJSON(geojson, {
             style: (feature) => {
               const poligonoNombre = feature.properties?.name?.toString();
-              const tieneArchivos = archivos.some((archivo) => {
-                const nombreArchivo = getArchivoName(archivo);
-                const cuadros =
-                  nombreArchivo
-                    .match(/_C(\d+)(?=_|$)/g)
-                    ?.map((match) => match.slice(2)) || [];
-                return cuadros.includes(poligonoNombre);
-              });
+              const tieneArchivos =
+                (archivosPorPoligono[poligonoNombre] || []).length > 0;
 
               return {
                 color: tieneArchivos ? "#28a745" : "#dc3545",
@@ -402,14 +396,8 @@ const Home = () => {
             },
             onEachFeature: (feature, layer) => {
               const poligonoNombre = feature.properties?.name?.toString();
-              const archivosAsociados = archivos.filter((archivo) => {
-                const nombreArchivo = getArchivoName(archivo);
-                const cuadros =
-                  nombreArchivo
-                    .match(/_C(\d+)(?=_|$)/g)
-                    ?.map((match) => match.slice(2)) || [];
-                return cuadros.includes(poligonoNombre);
-              });
+              const archivosAsociados =
+                archivosPorPoligono[poligonoNombre] || [];
 
               // Calcular el área del polígono
               let areaFormatted = "N/A";
@@ -557,16 +545,19 @@ layer.bindPopup(popupContainer);
       setKmlData(data);
 
       if (data.kmls && data.kmls.length > 0) {
+        // Índice polígono -> archivos ya agrupado por el backend
+        const indice = await fetchJson(
+          `${apiUrl}api/productor/kml/poligonos?cod_productor=${codProductor}`
+        );
         const nuevasCapas = [];
         for (const kml of data.kmls) {
           try {
             const nombreKml = kml.ruta_archivo.split("/").pop();
-            const archivos = kml.archivos || [];
 
             const capa = await cargarKmlEnMapa(
-              kml.ruta_archivo,
+              `${apiUrl}api/productor/kml/geojson?cod_productor=${codProductor}&id_kml=${kml.id_kml}`,
               nombreKml,
-              archivos
+              indice.kmls?.[kml.id_kml] || {}
             );
             nuevasCapas.push(capa);
           } catch (error) {
@@ -7,7 +7,6 @@ import L from "leaflet";
 import "leaflet-draw";
 import "leaflet-geometryutil";
 import "leaflet-kml";
-import * as toGeoJSON from "@mapbox/togeojson";
 import VerInformesClientes from "./VerinformesCliente";
 
 function ensureZipExtension(filename) {
@@ -161,26 +160,21 @@ const HomeCliente = () => {
     }
   };
 
-  const cargarKmlEnMapa = (kmlUrl, archivos) => {
+  const cargarKmlEnMapa = (geojsonUrl, archivosPorPoligono) => {
     return new Promise((resolve, reject) => {
-      fetch(kmlUrl)
-        .then((res) => res.text())
-        .then((kmlText) => {
-          const parser = new DOMParser();
-          const kml = parser.parseFromString(kmlText, "text/xml");
-          const geojson = toGeoJSON.kml(kml);
+      // GeoJSON precalculado en el backend al subir el KML
+      fetch(geojsonUrl)
+        .then((res) => {
+          if (!res.ok) throw new Error(`Error ${res.status} cargando GeoJSON`);
+          return res.json();
+        })
+        .then((geojson) => {
 
           const capa = L.geoJSON(geojson, {
             style: (feature) => {
               const poligonoNombre = feature.properties?.name?.toString();
-              const tieneArchivos = archivos.some((archivo) => {
-                const nombreArchivo = getArchivoName(archivo);
-                const cuadros =
-                  nombreArchivo
-                    .match(/_C(\d+)(?=_|$)/g)
-                    ?.map((match) => match.slice(2)) || [];
-                return cuadros.includes(poligonoNombre);
-              });
+              const tieneArchivos =
+                (archivosPorPoligono[poligonoNombre] || []).length > 0;
 
               return {
                 color: tieneArchivos ? "#28a745" : "#dc3545",
@@ -192,14 +186,8 @@ const HomeCliente = () => {
             },
             onEachFeature: (feature, layer) => {
               const poligonoNombre = feature.properties?.name?.toString();
-              const archivosAsociados = archivos.filter((archivo) => {
-                const nombreArchivo = getArchivoName(archivo);
-                const cuadros =
-                  nombreArchivo
-                    .match(/_C(\d+)(?=_|$)/g)
-                    ?.map((match) => match.slice(2)) || [];
-                return cuadros.includes(poligonoNombre);
-              });
+              const archivosAsociados =
+                archivosPorPoligono[poligonoNombre] || [];
 
               // Calcular el área del polígono
               let areaFormatted = "N/A";
@@ -356,12 +344,19 @@ const HomeCliente = () => {
       kmlLayers.forEach((layer) => mapRef.current?.removeLayer(layer));
       setKmlLayers([]);
 
+      // Índice polígono -> archivos ya agrupado por el backend
+      const indiceResponse = await fetch(
+        `${apiUrl}api/productor/kml/poligonos?cod_productor=${productorId}`
+      );
+      if (!indiceResponse.ok) throw new Error("Error cargando índice de polígonos");
+      const indice = await indiceResponse.json();
+
       const nuevasCapas = [];
       for (const kml of data.kmls) {
         try {
           const capa = await cargarKmlEnMapa(
-            kml.ruta_archivo,
-            kml.archivos || []
+            `${apiUrl}api/productor/kml/geojson?cod_productor=${productorId}&id_kml=${kml.id_kml}`,
+            indice.kmls?.[kml.id_kml] || {}
           );
           nuevasCapas.push(capa);
         } catch (error) {